@@ -1,14 +1,18 @@
 import streamlit as st
-import requests
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import pytz
-from streamlit_autorefresh import st_autorefresh
-from collections import Counter
+from inti_cuaca import parse_ensemble, build_periods, aggregate_periods, ensemble_period_rows, get_consensus_level, ensemble_statistics, horizon_summary, horizon_rows
+from cache_prakiraan import fetch_json, data_version
+import prefetch
+from kolom_ensemble import load_cube, save_cube
+from profil import Profil
+from cache_tabel import cached_table
 
 # 1. Konfigurasi Halaman & CSS
 st.set_page_config(page_title="Prakiraan Cuaca Sentani", layout="wide")
+prof = Profil("app_cuaca")
 
 st.markdown("""
     <style>
@@ -40,57 +44,67 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
-st_autorefresh(interval=60000, key="fokus_periode_update")
-
 # 2. Fungsi Fetch Data & Helper
-@st.cache_data(ttl=3600)
+ENSEMBLE_URL = "https://ensemble-api.open-meteo.com/v1/ensemble"
+
 def fetch_grand_ensemble(lat, lon, params):
-    url = "https://ensemble-api.open-meteo.com/v1/ensemble"
-    res = requests.get(url, params=params).json()
+    # Run terbaru disegarkan oleh prefetch (didaftarkan di period_list); render tidak menunggu jaringan
+    res = fetch_json(ENSEMBLE_URL, params, stale_ok=True)
     return res
 
-def get_weather_desc(code, rain_val=0):
-    if code is not None and not np.isnan(code):
-        mapping = {
-            0: "☀️ Cerah", 1: "🌤️ Cerah Berawan", 2: "⛅ Berawan", 3: "☁️ Mendung",
-            45: "🌫️ Kabut", 48: "🌫️ Kabut Berembun",
-            51: "🌦️ Gerimis Ringan", 53: "🌦️ Gerimis Sedang", 55: "🌧️ Gerimis Padat",
-            61: "🌧️ Hujan Ringan", 63: "🌧️ Hujan Sedang", 65: "🌧️ Hujan Lebat",
-            80: "🌦️ Hujan Lokal Rgn", 81: "🌧️ Hujan Lokal Sdng", 82: "⛈️ Hujan Lokal Lbt",
-            95: "⛈️ Badai Petir"
-        }
-        return mapping.get(int(code), f"Kode {int(code)}")
-    return "🌧️ Hujan" if rain_val > 0.1 else "☁️ Mendung"
-
-def get_confidence(std_val):
-    if std_val < 1.0: return "🟢 Tinggi"
-    elif std_val < 2.5: return "🟡 Sedang"
-    else: return "🔴 Rendah"
-
-def get_consensus_level(conditions_list):
-    keywords = []
-    for desc in conditions_list:
-        if "Hujan" in desc or "Gerimis" in desc: keywords.append("Hujan")
-        elif "Badai" in desc: keywords.append("Badai")
-        elif "Mendung" in desc or "Berawan" in desc: keywords.append("Berawan")
-        else: keywords.append("Cerah")
-    
-    counts = Counter(keywords)
-    max_agreement = counts.most_common(1)[0][1]
-    
-    if max_agreement >= 4: return "✅ KUAT (Model Kompak)", "blue"
-    elif max_agreement == 3: return "⚠️ SEDANG (Cukup Setuju)", "orange"
-    else: return "🚨 LEMAH (Berbeda Pendapat)", "red"
-
-def degrees_to_direction(deg):
-    if deg is None or np.isnan(deg): return "-"
-    directions = ['U', 'TL', 'T', 'TG', 'S', 'BD', 'B', 'BL']
-    idx = int((deg + 22.5) / 45) % 8
-    return directions[idx]
+@st.cache_resource(ttl=3600, max_entries=16)
+def load_ensemble_cube(lat, lon, params, versi, _prof):
+    # Kubus kolumnar per versi data: dibuka mmap dari disk (dibagi antar worker),
+    # atau di-parse sekali dari JSON lalu disimpan untuk proses lain
+    cube = load_cube(versi) if versi else None
+    if cube is None:
+        # Tahap fetch/parse hanya tercatat di profil saat cache kubus meleset
+        with _prof.stage("fetch"):
+            res = fetch_grand_ensemble(lat, lon, params)
+        with _prof.stage("parse"):
+            cube = parse_ensemble(res["hourly"], params["models"])
+        if versi and data_version(ENSEMBLE_URL, params) == versi: save_cube(versi, cube)
+    return cube
+
+@st.cache_data(ttl=3600, max_entries=64)
+def aggregate_cached(versi, pilihan_rentang, _cube):
+    # Agregat periode hanya dihitung ulang bila versi data atau daftar periode berubah
+    return aggregate_periods(_cube, pilihan_rentang)
+
+@st.cache_data(ttl=3600, max_entries=64)
+def statistics_cached(versi, pilihan_rentang, _cube):
+    # Persentil, peluang lewat ambang & skenario anggota; kunci sama dengan agregat
+    return ensemble_statistics(_cube, pilihan_rentang)
+
+@st.fragment(run_every=60)
+def update_box():
+    # Hanya kotak jam ini yang dirender ulang tiap menit, bukan seluruh halaman.
+    # Profil sendiri: rerun fragment tidak melewati prof.finish() di akhir script
+    prof_box = Profil("app_cuaca:update_box")
+    now_wit = datetime.now(tz_wit)
+    st.markdown(f"""
+        <div class="update-box">
+            <div class="update-title">🕒 Update Terakhir: {now_wit.strftime('%d %b %Y')}</div>
+            <div class="update-time">{now_wit.strftime('%H:%M:%S')} WIT</div>
+        </div>
+    """, unsafe_allow_html=True)
+    prof_box.finish(st.container())
+
+def build_period_table(per, statistik=None):
+    # Tabel, konsensus, curah maks & ringkasan peluang satu periode; dibangun sekali per versi data
+    results = ensemble_period_rows(per, model_info, with_confidence=True, rain_label="Hujan (mm)")
+    # Konsensus gabungan: setiap anggota dari semua model satu suara
+    consensus = get_consensus_level(per["member_cat"])
+    peluang = None
+    if statistik and (per["label"], per["date"]) in statistik["periods"]:
+        i = statistik["periods"].index((per["label"], per["date"]))
+        p10, p50, p90 = (np.nanmedian(statistik["rain_q"][j, i]) for j in range(3))
+        peluang = (" · ".join(f"≥{t} mm: {p:.0f}%" for t, p in zip(statistik["thresholds"], statistik["exceed_pooled"][i]))
+                   + f" | Median antar model P10/P50/P90: {p10:.1f} / {p50:.1f} / {p90:.1f} mm")
+    return pd.DataFrame(results), consensus, float(max(per["max_p"])), peluang
 
 # 3. Parameter & Sidebar
 tz_wit = pytz.timezone('Asia/Jayapura')
-now_wit = datetime.now(tz_wit)
 lat, lon = -2.5756744335142865, 140.5185071099937
 
 try:
@@ -101,12 +115,8 @@ try:
     server_placeholder = st.sidebar.empty()
     server_placeholder.success("🟢 **Server:** AKTIF")
     
-    st.sidebar.markdown(f"""
-        <div class="update-box">
-            <div class="update-title">🕒 Update Terakhir: {now_wit.strftime('%d %b %Y')}</div>
-            <div class="update-time">{now_wit.strftime('%H:%M:%S')} WIT</div>
-        </div>
-    """, unsafe_allow_html=True)
+    with st.sidebar:
+        update_box()
 
     st.sidebar.markdown("---")
     st.sidebar.subheader("🔗 Referensi Forecaster")
@@ -127,13 +137,19 @@ try:
 except:
     st.sidebar.warning("Logo tidak ditemukan")
 
+# Horizon: 2 hari per periode, atau hingga 16 hari dengan ringkasan harian setelahnya
+HORIZON = {"2 Hari (per periode)": 3, "16 Hari (+ ringkasan harian)": 16}
+st.sidebar.markdown("---")
+pilihan_horizon = st.sidebar.radio("🗓️ Horizon Prakiraan", list(HORIZON))
+
 # 4. Header Utama
 st.markdown("<h1 style='text-align: center;'>🛰️ Dashboard Prakiraan Cuaca Stamet Sentani</h1>", unsafe_allow_html=True)
 st.markdown("<h3 style='text-align: center; color: #555;'>Multi-Model Ensemble Consensus System</h3>", unsafe_allow_html=True)
 
 st.subheader("📍 Lokasi Titik Analisis")
 map_data = pd.DataFrame({'lat': [lat], 'lon': [lon]})
-st.map(map_data, zoom=13)
+with prof.stage("peta"):
+    st.map(map_data, zoom=13)
 st.caption(f"Titik Koordinat: {lat}, {lon}")
 st.markdown("---")
 
@@ -151,90 +167,70 @@ params = {
     "latitude": lat, "longitude": lon,
     "hourly": ["temperature_2m", "relative_humidity_2m", "precipitation", "weather_code", "wind_speed_10m", "wind_direction_10m"],
     "models": models_list,
-    "timezone": "Asia/Jayapura", "forecast_days": 3
+    "timezone": "Asia/Jayapura", "forecast_days": HORIZON[pilihan_horizon]
 }
 
-try:
-    res = fetch_grand_ensemble(lat, lon, params)
-    df = pd.DataFrame(res["hourly"])
-    df['time'] = pd.to_datetime(df['time']).dt.tz_localize(None)
-
-    # 6. Logika Periode Waktu
-    pilihan_rentang = []
-    urutan_waktu = [(0, 6, "DINI HARI"), (6, 12, "PAGI"), (12, 18, "SIANG"), (18, 24, "MALAM")]
-    
-    for i in range(2): 
-        dt = (now_wit + timedelta(days=i)).date()
-        for s, e, lbl in urutan_waktu:
-            if dt == now_wit.date():
-                if now_wit.hour < e or (now_wit.hour == e and now_wit.minute < 5):
-                    pilihan_rentang.append((s, e, lbl, dt))
-            else:
-                pilihan_rentang.append((s, e, lbl, dt))
-
-    # 7. Tampilkan Tabel
-    for idx, (start_h, end_h, label, t_date) in enumerate(pilihan_rentang):
-        df_kat = df[(df['time'].dt.date == t_date) & (df['time'].dt.hour >= start_h) & (df['time'].dt.hour < end_h)]
-        if df_kat.empty: continue
+@st.fragment(run_every=60)
+def period_list():
+    # Dirender ulang tiap menit agar periode bergeser di batasnya dan run baru dari
+    # prefetch langsung terbaca; tabel berat diambil dari cache per versi data.
+    # Profil sendiri per rerun fragment (tiap menit), dicatat & ditampilkan di badannya
+    prof_periode = Profil("app_cuaca:period_list")
+    try:
+        # Daftarkan penyegaran setiap tick, juga saat kubus sudah ada di disk:
+        # tanpa ini worker baru terus membaca versi lama dan purge cache tak berjalan
+        prefetch.ensure(ENSEMBLE_URL, params)
+        with prof_periode.stage("versi"):
+            versi = data_version(ENSEMBLE_URL, params)
+        cube = load_ensemble_cube(lat, lon, params, versi, prof_periode)
+
+        # 6. Logika Periode Waktu
+        pilihan_rentang = build_periods(datetime.now(tz_wit), days=2, grace_minutes=5)
+        with prof_periode.stage("agregasi"):
+            agregat = aggregate_cached(versi, pilihan_rentang, cube)
+            statistik = statistics_cached(versi, pilihan_rentang, cube)
+
+        # 7. Tampilkan Tabel
+        with prof_periode.stage("periode"):
+            for idx, per in enumerate(agregat):
+                if per is None: continue
+                start_h, end_h, label, t_date = per["start_h"], per["end_h"], per["label"], per["date"]
         
-        with st.expander(f"📅 {label} ({start_h:02d}:00-{end_h:02d}:00) | {t_date.strftime('%d %b %Y')}", expanded=(idx<4)):
-            results = []
-            all_max_prec = []
-            
-            for m in models_list:
-                m_prec = [c for c in df.columns if m in c and "precipitation" in c]
-                m_temp = [c for c in df.columns if m in c and "temperature_2m" in c]
-                m_rh   = [c for c in df.columns if m in c and "relative_humidity_2m" in c]
-                m_ws   = [c for c in df.columns if m in c and "wind_speed_10m" in c]
-                m_wd   = [c for c in df.columns if m in c and "wind_direction_10m" in c]
-                m_code = [c for c in df.columns if m in c and "weather_code" in c]
-                
-                # Confidence Internal (Internal Spread)
-                std_temp = df_kat[m_temp].std(axis=1).mean()
-                confidence = get_confidence(std_temp)
-
-                # Probabilitas & Curah Maks (Anggota Terbasah)
-                prob = (df_kat[m_prec] > 0.5).sum(axis=1).mean() / len(m_prec) * 100
-                max_p = df_kat[m_prec].sum().max()
-                all_max_prec.append(max_p)
-                
-                t_min, t_max = df_kat[m_temp].min().min(), df_kat[m_temp].max().max()
-                rh_min, rh_max = df_kat[m_rh].min().min(), df_kat[m_rh].max().max()
-                ws_mean = df_kat[m_ws].mean().mean()
-                wd_mean = df_kat[m_wd].mean().mean()
-
-                if m_code:
-                    code_val = df_kat[m_code].mode(axis=1).iloc[0].mode()[0]
-                    desc = get_weather_desc(code_val)
-                else:
-                    desc = get_weather_desc(None, max_p)
-                
-                results.append({
-                    "Model": m.split('_')[0].upper(),
-                    "Kondisi": desc,
-                    "Indeks Kepastian": confidence,
-                    "Suhu (°C)": f"{t_min:.1f}-{t_max:.1f}",
-                    "RH (%)": f"{int(rh_min)}-{int(rh_max)}",
-                    "Angin (km/jam)": f"{ws_mean:.1f} {degrees_to_direction(wd_mean)}",
-                    "Prob. Hujan": f"{prob:.0f}%",
-                    "Hujan (mm)": round(max_p, 1)
-                })
+                with st.expander(f"📅 {label} ({start_h:02d}:00-{end_h:02d}:00) | {t_date.strftime('%d %b %Y')}", expanded=(idx<4)):
+                    df_tabel, (consensus_msg, consensus_clr), total_max, peluang = cached_table(
+                        versi, t_date, label, "app_cuaca", lambda: build_period_table(per, statistik))
             
-            st.table(pd.DataFrame(results))
+                    st.table(df_tabel)
             
-            # --- ANALISIS KONSENSUS ANTAR MODEL ---
-            all_conds = [r["Kondisi"] for r in results]
-            consensus_msg, consensus_clr = get_consensus_level(all_conds)
-            st.markdown(f"**Analisis Konsensus Model Dunia:** :{consensus_clr}[{consensus_msg}]")
+                    # --- ANALISIS KONSENSUS ANTAR MODEL ---
+                    st.markdown(f"**Analisis Konsensus Model Dunia:** :{consensus_clr}[{consensus_msg}]")
             
-            total_max = max(all_max_prec)
-            if total_max >= 5.0:
-                st.warning(f"⚠️ **PERINGATAN DINI:** Potensi hujan terdeteksi. Estimasi maks: {total_max:.1f} mm.")
-            else:
-                st.success(f"✅ **AMAN:** Kondisi cenderung stabil. (Maks: {total_max:.1f} mm)")
+                    if total_max >= 5.0:
+                        st.warning(f"⚠️ **PERINGATAN DINI:** Potensi hujan terdeteksi. Estimasi maks: {total_max:.1f} mm.")
+                    else:
+                        st.success(f"✅ **AMAN:** Kondisi cenderung stabil. (Maks: {total_max:.1f} mm)")
+                    if peluang: st.caption(f"📈 Peluang hujan gabungan seluruh anggota: {peluang}")
 
-except Exception as e:
-    st.error(f"⚠️ Terjadi gangguan data: {e}")
+            # --- SKENARIO ANGGOTA ENSEMBLE ---
+            if statistik:
+                skenario = " · ".join(f"**{n}** {p:.0f}%" for n, p in zip(statistik["scenario_names"], statistik["scenario_share_pooled"]))
+                st.markdown(f"**📈 Skenario Anggota Ensemble (pola hujan {len(statistik['periods'])} periode):** {skenario}")
+
+
+        # Horizon panjang: hanya 2 hari pertama per periode jam-an, sisanya ringkasan harian
+        if params["forecast_days"] > 3:
+            mulai = (datetime.now(tz_wit) + timedelta(days=2)).date()
+            with prof_periode.stage("horizon"):
+                df_horizon = cached_table(versi, mulai, "HARIAN", "app_cuaca",
+                                          lambda: pd.DataFrame(horizon_rows(horizon_summary(cube, mulai))))
+            st.subheader(f"🗓️ Ringkasan Harian Gabungan Anggota (mulai {mulai.strftime('%d %b %Y')})")
+            st.table(df_horizon)
+
+    except Exception as e:
+        st.error(f"⚠️ Terjadi gangguan data: {e}")
+    prof_periode.finish(st.container())
+
+period_list()
 
 # 8. Copyright & Footer
 st.markdown("---")
@@ -245,5 +241,4 @@ st.markdown(f"""
     </div>
 """, unsafe_allow_html=True)
 
-
-
+prof.finish()
@@ -0,0 +1,245 @@
+import csv
+import io
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from cache_prakiraan import CACHE_DIR
+from inti_cuaca import parse_ensemble, as_float, URUTAN_WAKTU
+from jadwal_model import latest_available, schedule_for
+
+# Arsip historis prakiraan: setiap run baru yang diunduh cache_prakiraan ditambahkan
+# ke file berpartisi tanggal berlaku / model / lokasi:
+#   arsip/<YYYY-MM-DD>/<model>/<lokasi>.bin
+# Tiap run model (jam inisialisasi model itu sendiri) = satu blok kolumnar (npz
+# terkompresi; float32, int8 kode cuaca, uint16 arah angin seperti kubus ensemble)
+# yang hanya ditambahkan di ujung file. Indeks SQLite (lokasi, tanggal, model,
+# init) -> (file, offset, panjang) menjawab kueri
+# tanpa memindai arsip; satu file per partisi menjaga jumlah file tetap kecil
+# walau berbulan-bulan data per jam untuk banyak stasiun.
+#
+#   python arsip.py Sentani 2026-10-15 SIANG     # semua run untuk periode itu
+#   python arsip.py --ringkas                     # jumlah blok & ukuran per jenis
+
+ARSIP_DIR = os.environ.get("CUACA_ARSIP_DIR", os.path.join(CACHE_DIR, "arsip"))
+INDEKS_PATH = os.path.join(ARSIP_DIR, "indeks.sqlite")
+STASIUN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stasiun.csv")
+
+
+# --- 1. INDEKS ---
+def _connect():
+    os.makedirs(ARSIP_DIR, exist_ok=True)
+    con = sqlite3.connect(INDEKS_PATH, timeout=30)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA busy_timeout=30000")
+    kolom = [r[1] for r in con.execute("PRAGMA table_info(segmen)")]
+    if kolom and "init" not in kolom: _migrate(con)
+    con.execute(SKEMA_SEGMEN.format(nama="segmen"))
+    con.execute("CREATE INDEX IF NOT EXISTS segmen_tanggal ON segmen (tanggal, model)")
+    return con
+
+
+# init = jam inisialisasi run model itu sendiri; run = slot gabungan saat blok pertama diunduh
+SKEMA_SEGMEN = """CREATE TABLE IF NOT EXISTS {nama} (
+    lokasi TEXT NOT NULL, tanggal TEXT NOT NULL, model TEXT NOT NULL, init TEXT NOT NULL, run TEXT NOT NULL,
+    jenis TEXT NOT NULL, utc_offset INTEGER NOT NULL, path TEXT NOT NULL,
+    offset INTEGER NOT NULL, panjang INTEGER NOT NULL, n_anggota INTEGER NOT NULL,
+    dibuat REAL NOT NULL, PRIMARY KEY (lokasi, tanggal, model, init)) WITHOUT ROWID"""
+
+
+def _migrate(con):
+    # Indeks lama dikunci slot run gabungan, sehingga run model yang sama tersimpan
+    # berulang kali. Kunci ulang ke init model; hanya blok pertama tiap run yang dipakai.
+    rows = con.execute("""SELECT lokasi, tanggal, model, run, jenis, utc_offset, path, offset, panjang,
+                          n_anggota, dibuat FROM segmen ORDER BY dibuat""").fetchall()
+    with con:
+        con.execute("DROP INDEX IF EXISTS segmen_tanggal")
+        con.execute(SKEMA_SEGMEN.format(nama="segmen_baru"))
+        con.executemany("INSERT OR IGNORE INTO segmen_baru VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        [r[:3] + (model_init(r[2], r[3]),) + r[3:] for r in rows])
+        con.execute("DROP TABLE segmen")
+        con.execute("ALTER TABLE segmen_baru RENAME TO segmen")
+
+
+def model_init(model, run):
+    # Jam inisialisasi run `model` yang terbaru pada slot gabungan `run` ("YYYY-MM-DDTHH", UTC):
+    # run model yang terakhir tersedia saat itu, dikurangi jeda rilisnya
+    tersedia = latest_available(model, datetime.strptime(run, "%Y-%m-%dT%H").replace(tzinfo=timezone.utc))
+    return (tersedia - timedelta(hours=schedule_for(model)["delay_h"])).strftime("%Y-%m-%dT%H")
+
+
+def location_key(lat, lon):
+    # Dibulatkan 3 desimal (~100 m): koordinat stasiun.csv & dashboard jatuh ke kunci yang sama
+    return f"{float(lat):.3f}_{float(lon):.3f}"
+
+
+def _load_stations():
+    if not os.path.exists(STASIUN_PATH): return {}
+    with open(STASIUN_PATH, newline="", encoding="utf-8") as f:
+        return {r["nama"]: location_key(r["lat"], r["lon"]) for r in csv.DictReader(f)}
+
+
+def resolve_location(lokasi):
+    # (lat, lon), kunci lokasi, atau nama/awalan nama stasiun di stasiun.csv
+    if isinstance(lokasi, (tuple, list)): return location_key(*lokasi)
+    stasiun = _load_stations()
+    if lokasi in stasiun: return stasiun[lokasi]
+    cocok = [k for nama, k in stasiun.items() if nama.lower().startswith(lokasi.lower())]
+    return cocok[0] if cocok else lokasi
+
+
+# --- 2. PENULISAN ---
+def _encode(arrays):
+    buf = io.BytesIO()
+    np.savez_compressed(buf, **arrays)
+    return buf.getvalue()
+
+
+def _day_slices(times):
+    days = times.astype("datetime64[D]")
+    edges = np.concatenate(([0], np.flatnonzero(np.diff(days)) + 1, [days.size]))
+    return [(days[a], int(a), int(b)) for a, b in zip(edges[:-1], edges[1:])]
+
+
+def append_run(url, params, run, payload):
+    # Pecah satu respons per tanggal berlaku & model lalu tambahkan sebagai blok baru.
+    # Blok dikunci init model itu sendiri, bukan slot gabungan `run`: model yang belum
+    # merilis run baru tidak diarsipkan ulang. Mengembalikan jumlah blok yang ditulis.
+    if not isinstance(payload, dict) or "hourly" not in payload: return 0
+    jenis = "ensemble" if "ensemble" in url else "deterministik"
+    models = params.get("models", [])
+    if isinstance(models, str): models = models.split(",")
+    variables = params.get("hourly", [])
+    if isinstance(variables, str): variables = variables.split(",")
+    cube = parse_ensemble(payload["hourly"], list(models), list(variables))
+    if not cube["index"]: return 0
+
+    lokasi = location_key(params["latitude"], params["longitude"])
+    utc_offset = int(payload.get("utc_offset_seconds", 0))
+    times = cube["time"]
+    init = {m: model_init(m, run) for m in cube["models"]}
+
+    con = _connect()
+    try:
+        # Blok yang sudah ada (run model sama dari slot lain atau forecast_days lain) tidak dikodekan ulang
+        ada = set(con.execute("SELECT tanggal, model, init FROM segmen WHERE lokasi = ? AND tanggal BETWEEN ? AND ?",
+                              (lokasi, str(times[0].astype("datetime64[D]")), str(times[-1].astype("datetime64[D]")))))
+    finally:
+        con.close()
+
+    blok = []
+    for day, a, b in _day_slices(times):
+        tanggal = str(day)
+        jam = ((times[a:b] - day) // np.timedelta64(1, "h")).astype(np.int8)
+        for mi, m in enumerate(cube["models"]):
+            anggota = np.flatnonzero(cube["member_mask"][mi])
+            if anggota.size == 0 or (tanggal, m, init[m]) in ada: continue
+            arrays = {v: cube["data"][v][mi, anggota, a:b] for v in cube["variables"]}
+            # Horizon di luar jangkauan model (semua hilang) tidak disimpan
+            if all(np.isnan(as_float(x)).all() for x in arrays.values()): continue
+            blok.append((tanggal, m, anggota.size,
+                         _encode({"jam": jam, "anggota": anggota.astype(np.int16), **arrays})))
+    if not blok: return 0
+
+    con = _connect()
+    ditulis = 0
+    try:
+        # BEGIN IMMEDIATE: satu penulis antar proses sehingga offset tidak bertabrakan
+        con.execute("BEGIN IMMEDIATE")
+        for tanggal, m, n_anggota, data in blok:
+            if con.execute("SELECT 1 FROM segmen WHERE lokasi = ? AND tanggal = ? AND model = ? AND init = ?",
+                           (lokasi, tanggal, m, init[m])).fetchone():
+                continue
+            rel = os.path.join(tanggal, m, f"{lokasi}.bin")
+            path = os.path.join(ARSIP_DIR, rel)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "ab") as f:
+                offset = f.tell()
+                f.write(data)
+            con.execute("INSERT INTO segmen VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (lokasi, tanggal, m, init[m], run, jenis, utc_offset, rel, offset, len(data), n_anggota, time.time()))
+            ditulis += 1
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+    finally:
+        con.close()
+    return ditulis
+
+
+# --- 3. KUERI ---
+def read_block(path, offset, panjang, variables=None):
+    # Satu blok dari file partisi; `variables` membatasi array yang didekompresi
+    with open(os.path.join(ARSIP_DIR, path), "rb") as f:
+        f.seek(offset)
+        with np.load(io.BytesIO(f.read(panjang))) as z:
+            keys = z.files if variables is None else [k for k in z.files if k in ("jam", "anggota", *variables)]
+            return {k: z[k] for k in keys}
+
+
+def query(lokasi, tanggal, periode=None, model=None, jenis=None):
+    # Semua run tersimpan untuk satu lokasi & tanggal berlaku (opsional: periode
+    # DINI HARI/PAGI/SIANG/MALAM, model, jenis). Hanya blok yang cocok yang dibaca.
+    # -> [{init, run, model, jenis, utc_offset, jam, anggota, data: {variabel: (anggota, jam)}}]
+    sql = "SELECT init, run, model, jenis, utc_offset, path, offset, panjang FROM segmen WHERE lokasi = ? AND tanggal = ?"
+    args = [resolve_location(lokasi), str(tanggal)]
+    if model: sql, args = sql + " AND model = ?", args + [model]
+    if jenis: sql, args = sql + " AND jenis = ?", args + [jenis]
+    if not os.path.exists(INDEKS_PATH): return []
+    con = _connect()
+    try:
+        rows = con.execute(sql + " ORDER BY model, init", args).fetchall()
+    finally:
+        con.close()
+
+    rentang = next(((s, e) for s, e, lbl in URUTAN_WAKTU if lbl == periode), None) if periode else None
+    hasil = []
+    for init, run, m, j, utc_offset, path, offset, panjang in rows:
+        blok = read_block(path, offset, panjang)
+        jam, anggota = blok.pop("jam"), blok.pop("anggota")
+        if rentang:
+            pilih = (jam >= rentang[0]) & (jam < rentang[1])
+            if not pilih.any(): continue
+            jam, blok = jam[pilih], {v: x[:, pilih] for v, x in blok.items()}
+        hasil.append({"init": init, "run": run, "model": m, "jenis": j, "utc_offset": utc_offset,
+                      "jam": jam, "anggota": anggota, "data": blok})
+    return hasil
+
+
+def segments(lokasi, awal, akhir):
+    # Baris indeks satu lokasi untuk tanggal berlaku awal..akhir (inklusif):
+    # (lokasi, tanggal, model, init, jenis, utc_offset, path, offset, panjang); satu baris per run model
+    if not os.path.exists(INDEKS_PATH): return []
+    con = _connect()
+    try:
+        return con.execute("""SELECT lokasi, tanggal, model, init, jenis, utc_offset, path, offset, panjang
+                              FROM segmen WHERE lokasi = ? AND tanggal BETWEEN ? AND ?""",
+                           (resolve_location(lokasi), str(awal), str(akhir))).fetchall()
+    finally:
+        con.close()
+
+
+def summary():
+    if not os.path.exists(INDEKS_PATH): return []
+    con = _connect()
+    try:
+        return con.execute("""SELECT jenis, COUNT(*), COUNT(DISTINCT lokasi), MIN(tanggal), MAX(tanggal),
+                              SUM(panjang) FROM segmen GROUP BY jenis""").fetchall()
+    finally:
+        con.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] == "--ringkas":
+        for jenis, n, n_lok, awal, akhir, ukuran in summary():
+            print(f"{jenis:<14} {n:>8} blok  {n_lok:>4} lokasi  {awal} s.d. {akhir}  {ukuran / 2**20:8.1f} MB")
+        sys.exit(0)
+    periode = " ".join(sys.argv[3:]) or None
+    for r in query(sys.argv[1], sys.argv[2], periode):
+        ringkas = " ".join(f"{v}={np.nanmean(as_float(x)):.1f}" for v, x in r["data"].items())
+        print(f"{r['init']}  {r['model']:<28} {len(r['anggota']):>3} anggota  jam {r['jam'].min()}-{r['jam'].max()}  {ringkas}")
@@ -0,0 +1,94 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+
+import fixtures
+from inti_cuaca import parse_ensemble, build_periods, build_period_index, as_float, period_codes
+
+# Kode cuaca per periode & model pada fixture ensemble: modus baris pandas lama
+# (hanya jam pertama), modus jam pertama NumPy, dan histogram bincount seluruh
+# anggota & jam (period_codes).
+#
+#   python bench/bench_kode_cuaca.py [--hari 3] [--ulang 5]
+
+
+def legacy_pandas(df, models, periods):
+    # df_kat[m_code].mode(axis=1).iloc[0].mode()[0] per model & periode, seperti kode awal app_cuaca
+    hasil = []
+    for start, stop in periods:
+        df_kat = df.iloc[start:stop]
+        for m in models:
+            m_code = [c for c in df.columns if m in c and "weather_code" in c]
+            hasil.append(df_kat[m_code].mode(axis=1).iloc[0].mode()[0])
+    return hasil
+
+
+def first_hour(cube, periods):
+    code = as_float(cube["data"]["weather_code"])
+    hasil = []
+    for start, stop in periods:
+        for mi in range(code.shape[0]):
+            vals = code[mi, :, start]
+            vals = vals[~np.isnan(vals)]
+            uniq, counts = np.unique(vals, return_counts=True)
+            hasil.append(float(uniq[np.argmax(counts)]))
+    return hasil
+
+
+def histogram(cube, periods):
+    code = as_float(cube["data"]["weather_code"])
+    return [period_codes(code[..., start:stop]) for start, stop in periods]
+
+
+def _waktu(fn, repeat):
+    t = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        t.append(time.perf_counter() - t0)
+    return statistics.median(t) * 1000
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark kode cuaca per periode ensemble")
+    ap.add_argument("--hari", type=int, default=3)
+    ap.add_argument("--ulang", type=int, default=5)
+    args = ap.parse_args(argv)
+
+    res = json.loads(fixtures.load_text("ensemble", args.hari))
+    models = list(fixtures.ANGGOTA_ENSEMBLE)
+    cube = parse_ensemble(res["hourly"], models)
+    df = pd.DataFrame(res["hourly"])
+    index = build_period_index(cube["time"])
+    now = datetime.fromisoformat(str(cube["time"][0])[:16])
+    periods = [index[d, lbl] for _, _, lbl, d in build_periods(now, days=args.hari) if (d, lbl) in index]
+
+    print(f"{len(periods)} periode x {len(models)} model, {sum(fixtures.ANGGOTA_ENSEMBLE.values())} anggota")
+    kasus = {
+        "pandas mode(axis=1), jam pertama": lambda: legacy_pandas(df, models, periods),
+        "numpy unique, jam pertama": lambda: first_hour(cube, periods),
+        "bincount seluruh periode": lambda: histogram(cube, periods),
+    }
+    acuan = None
+    for nama, fn in kasus.items():
+        ms = _waktu(fn, args.ulang)
+        acuan = acuan or ms
+        print(f"  {nama:<34} {ms:>9.2f}ms  ({acuan / ms:6.1f}x)")
+
+    # Modus jam pertama tetap sama antara pandas lama dan versi NumPy
+    assert np.allclose(legacy_pandas(df, models, periods), first_hour(cube, periods))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+
+import fixtures
+from grafik_cuaca import chart_series
+from inti_cuaca import (parse_ensemble, build_periods, aggregate_periods, build_period_index,
+                        ensemble_period_rows, model_period_rows, ensemble_statistics)
+
+# Benchmark bagian olah data keempat dashboard terhadap fixture Open-Meteo
+# (tanpa jaringan, tanpa Streamlit). Setiap pipeline adalah generator yang
+# menandai akhir tiap tahap; pengukur mencatat waktu dan puncak memori per tahap.
+#
+#   python bench/bench_pipeline.py                 # semua app, 3/7/16 hari
+#   python bench/bench_pipeline.py --bandingkan    # bandingkan dengan commit sebelumnya
+
+RIWAYAT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "riwayat.jsonl")
+STAGES = ("parse", "agregasi", "tabel")
+
+
+# --- 1. PIPELINE PER APP ---
+def _periods_all(first_time, days):
+    # Semua periode pada horizon fixture, mulai jam pertama data
+    now = datetime.fromisoformat(str(first_time)[:16])
+    return build_periods(now, days=days)
+
+
+def pipeline_ensemble(text, days, statistics=False, **row_opts):
+    res = json.loads(text)
+    cube = parse_ensemble(res["hourly"], list(fixtures.ANGGOTA_ENSEMBLE))
+    yield "parse"
+
+    periods = _periods_all(cube["time"][0], days)
+    agregat = aggregate_periods(cube, periods)
+    statistik = ensemble_statistics(cube, periods) if statistics else None
+    yield "agregasi"
+
+    model_info = dict.fromkeys(fixtures.ANGGOTA_ENSEMBLE, "")
+    tables = [pd.DataFrame(ensemble_period_rows(per, model_info, **row_opts)) for per in agregat if per is not None]
+    yield "tabel"
+    del tables, statistik
+
+
+def pipeline_deterministik(text, days, **row_opts):
+    res = json.loads(text)
+    df = pd.DataFrame(res["hourly"])
+    df['time'] = pd.to_datetime(df['time']).dt.tz_localize(None)
+    yield "parse"
+
+    models = fixtures.MODEL_DETERMINISTIK
+    period_index = build_period_index(df['time'].to_numpy())
+    # Grafik tren sepanjang horizon fixture (diperkecil bila > MAX_TITIK jam)
+    temp_chart, prob_chart = chart_series(res["hourly"], models, df['time'].iloc[0], 24 * days)
+    yield "agregasi"
+
+    model_info = dict.fromkeys(models, "")
+    tables = []
+    for start_h, end_h, label, t_date in _periods_all(df['time'].iloc[0], days):
+        if (t_date, label) not in period_index: continue
+        start, stop = period_index[t_date, label]
+        rows, _ = model_period_rows(df.iloc[start:stop], model_info, **row_opts)
+        tables.append(pd.DataFrame(rows))
+    yield "tabel"
+    del temp_chart, prob_chart, tables
+
+
+PIPELINES = {
+    "app_cuaca": ("ensemble", pipeline_ensemble, {"statistics": True, "with_confidence": True, "rain_label": "Hujan (mm)"}),
+    "ecmwfensemble": ("ensemble", pipeline_ensemble, {"with_country": True}),
+    "mainkode": ("deterministik", pipeline_deterministik, {}),
+    "semuakota": ("deterministik", pipeline_deterministik, {"with_rh": False, "rain_label": "Curah (mm)"}),
+}
+
+
+# --- 2. PENGUKURAN ---
+def measure(app, days, repeat):
+    jenis, fn, opts = PIPELINES[app]
+    text = fixtures.load_text(jenis, days)
+
+    waktu = {s: [] for s in STAGES}
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for stage in fn(text, days, **opts):
+            t1 = time.perf_counter()
+            waktu[stage].append(t1 - t0)
+            t0 = t1
+
+    # Satu putaran terpisah di bawah tracemalloc (memperlambat, jadi tidak ikut diukur waktunya)
+    peak = {}
+    tracemalloc.start()
+    for stage in fn(text, days, **opts):
+        peak[stage] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.reset_peak()
+    tracemalloc.stop()
+
+    hasil = {"app": app, "hari": days, "bytes": len(text)}
+    for s in STAGES:
+        hasil[f"{s}_ms"] = statistics.median(waktu[s]) * 1000
+        hasil[f"{s}_peak_mb"] = peak[s] / 2**20
+    hasil["total_ms"] = sum(hasil[f"{s}_ms"] for s in STAGES)
+    hasil["peak_mb"] = max(hasil[f"{s}_peak_mb"] for s in STAGES)
+    return hasil
+
+
+# --- 3. RIWAYAT & REGRESI ---
+def _commit():
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return rev + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _load_riwayat():
+    if not os.path.exists(RIWAYAT_PATH): return []
+    with open(RIWAYAT_PATH) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare(hasil, commit, ambang):
+    sebelumnya = [r for r in _load_riwayat() if r["commit"] != commit]
+    if not sebelumnya:
+        print("\nBelum ada riwayat commit lain untuk dibandingkan.")
+        return 0
+    acuan_commit = sebelumnya[-1]["commit"]
+    acuan = {(r["app"], r["hari"]): r for r in sebelumnya if r["commit"] == acuan_commit}
+
+    print(f"\nPerbandingan dengan {acuan_commit} (ambang regresi {ambang:.0f}%):")
+    regresi = 0
+    for r in hasil:
+        a = acuan.get((r["app"], r["hari"]))
+        if a is None: continue
+        for kolom in ("total_ms", "peak_mb"):
+            delta = (r[kolom] - a[kolom]) / a[kolom] * 100 if a[kolom] else 0.0
+            tanda = "REGRESI" if delta > ambang else ""
+            if tanda: regresi += 1
+            print(f"  {r['app']:<14} {r['hari']:>2}h {kolom:<9} {a[kolom]:>9.2f} -> {r[kolom]:>9.2f} ({delta:+6.1f}%) {tanda}")
+    return regresi
+
+
+# --- 4. CLI ---
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark pipeline data dashboard cuaca")
+    ap.add_argument("--app", nargs="*", default=list(PIPELINES), choices=list(PIPELINES))
+    ap.add_argument("--hari", default=",".join(str(d) for d in fixtures.HORIZONS),
+                    help="horizon fixture, dipisah koma (3,7,16)")
+    ap.add_argument("--ulang", type=int, default=5, help="jumlah pengulangan per kasus (median)")
+    ap.add_argument("--bandingkan", action="store_true", help="bandingkan dengan commit sebelumnya")
+    ap.add_argument("--ambang", type=float, default=15.0, help="ambang regresi dalam persen")
+    ap.add_argument("--tanpa-simpan", action="store_true", help="jangan tambahkan hasil ke riwayat")
+    args = ap.parse_args(argv)
+
+    commit = _commit()
+    hasil = []
+    print(f"{'app':<14} {'hari':>4} {'parse':>9} {'agregasi':>9} {'tabel':>9} {'total':>9} {'peak':>8}")
+    for app in args.app:
+        for days in (int(d) for d in args.hari.split(",")):
+            r = measure(app, days, args.ulang)
+            r.update({"commit": commit, "waktu": datetime.now().isoformat(timespec="seconds")})
+            hasil.append(r)
+            print(f"{app:<14} {days:>4} {r['parse_ms']:>7.1f}ms {r['agregasi_ms']:>7.1f}ms "
+                  f"{r['tabel_ms']:>7.1f}ms {r['total_ms']:>7.1f}ms {r['peak_mb']:>6.1f}MB")
+
+    regresi = compare(hasil, commit, args.ambang) if args.bandingkan else 0
+    if not args.tanpa_simpan:
+        with open(RIWAYAT_PATH, "a") as f:
+            for r in hasil: f.write(json.dumps(r) + "\n")
+    return 1 if regresi else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
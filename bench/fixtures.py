@@ -0,0 +1,126 @@
+import gzip
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# Fixture respons Open-Meteo untuk benchmark tanpa jaringan.
+# Default: data sintetis deterministik dengan struktur kolom persis seperti API
+# (deterministik: <var>_<model>; ensemble: <var>_<model> + <var>_memberNN_<model>).
+# `python bench/fixtures.py --rekam` merekam respons asli untuk Sentani.
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+HORIZONS = (3, 7, 16)
+
+LAT, LON = -2.5757, 140.5185
+
+MODEL_DETERMINISTIK = ["ecmwf_ifs", "gfs_seamless", "jma_seamless", "icon_seamless",
+                       "gem_seamless", "meteofrance_seamless", "ukmo_seamless"]
+VAR_DETERMINISTIK = ["temperature_2m", "relative_humidity_2m", "wind_speed_10m",
+                     "wind_direction_10m", "weather_code", "precipitation_probability", "precipitation"]
+
+# Jumlah anggota (termasuk kontrol) per sistem ensemble
+ANGGOTA_ENSEMBLE = {
+    "ecmwf_ifs025_ensemble": 51,
+    "ncep_gefs025": 31,
+    "ukmo_global_ensemble_20km": 18,
+    "icon_global_eps": 40,
+    "gem_global_ensemble": 21,
+}
+VAR_ENSEMBLE = ["temperature_2m", "relative_humidity_2m", "precipitation",
+                "weather_code", "wind_speed_10m", "wind_direction_10m"]
+
+URL = {
+    "deterministik": "https://api.open-meteo.com/v1/forecast",
+    "ensemble": "https://ensemble-api.open-meteo.com/v1/ensemble",
+}
+
+
+def _series(rng, var, n):
+    jam = np.arange(n) % 24
+    if var == "temperature_2m":
+        x = 27 + 4 * np.sin((jam - 8) / 24 * 2 * np.pi) + rng.normal(0, 1.2, n)
+    elif var == "relative_humidity_2m":
+        x = np.clip(82 - 12 * np.sin((jam - 8) / 24 * 2 * np.pi) + rng.normal(0, 5, n), 30, 100).round()
+    elif var == "precipitation":
+        x = np.where(rng.random(n) < 0.3, rng.gamma(0.6, 2.5, n), 0).round(1)
+    elif var == "precipitation_probability":
+        x = rng.integers(0, 101, n).astype(float)
+    elif var == "weather_code":
+        x = rng.choice([0, 1, 2, 3, 51, 53, 61, 63, 65, 80, 81, 95], n).astype(float)
+    elif var == "wind_speed_10m":
+        x = np.abs(rng.normal(9, 4, n)).round(1)
+    else:
+        x = rng.uniform(0, 360, n).round()
+    return x.tolist()
+
+
+def synthetic(jenis, days, seed=0, start=None):
+    rng = np.random.default_rng(seed)
+    n = 24 * days
+    t0 = start or datetime(2026, 10, 15)
+    hourly = {"time": [(t0 + timedelta(hours=i)).strftime("%Y-%m-%dT%H:%M") for i in range(n)]}
+    if jenis == "deterministik":
+        for v in VAR_DETERMINISTIK:
+            for m in MODEL_DETERMINISTIK:
+                hourly[f"{v}_{m}"] = _series(rng, v, n)
+    else:
+        for v in VAR_ENSEMBLE:
+            for m, k in ANGGOTA_ENSEMBLE.items():
+                for j in range(k):
+                    key = f"{v}_{m}" if j == 0 else f"{v}_member{j:02d}_{m}"
+                    hourly[key] = _series(rng, v, n)
+    return {"latitude": LAT, "longitude": LON, "timezone": "Asia/Jayapura", "hourly": hourly}
+
+
+def params_for(jenis, days):
+    return {
+        "latitude": LAT, "longitude": LON,
+        "hourly": VAR_DETERMINISTIK if jenis == "deterministik" else VAR_ENSEMBLE,
+        "models": MODEL_DETERMINISTIK if jenis == "deterministik" else list(ANGGOTA_ENSEMBLE),
+        "timezone": "Asia/Jayapura", "forecast_days": days,
+    }
+
+
+def path_for(jenis, days):
+    return os.path.join(FIXTURE_DIR, f"{jenis}_{days}d.json.gz")
+
+
+def load_text(jenis, days):
+    # Teks JSON mentah (parsing JSON termasuk dalam tahap yang diukur)
+    path = path_for(jenis, days)
+    if not os.path.exists(path):
+        write(jenis, days, synthetic(jenis, days))
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return f.read()
+
+
+def write(jenis, days, payload):
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    with gzip.open(path_for(jenis, days), "wt", encoding="utf-8") as f:
+        json.dump(payload, f, separators=(",", ":"))
+
+
+def record():
+    import requests
+    for jenis in URL:
+        for days in HORIZONS:
+            # Deterministik di Open-Meteo maksimal 16 hari, ensemble hingga 35 hari
+            res = requests.get(URL[jenis], params=params_for(jenis, days), timeout=120).json()
+            if res.get("error"):
+                print(f"Gagal merekam {jenis} {days} hari: {res.get('reason')}")
+                continue
+            write(jenis, days, res)
+            print(f"Direkam: {path_for(jenis, days)}")
+
+
+if __name__ == "__main__":
+    if "--rekam" in sys.argv:
+        record()
+    else:
+        for jenis in URL:
+            for days in HORIZONS:
+                write(jenis, days, synthetic(jenis, days))
+                print(f"Dibuat: {path_for(jenis, days)}")
@@ -0,0 +1,214 @@
+import argparse
+import csv
+import html
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pytz
+
+from cache_prakiraan import fetch_json_many
+from inti_cuaca import (parse_ensemble, build_periods, build_period_index, aggregate_periods,
+                        ensemble_period_rows, model_period_rows, analyze_consensus,
+                        get_consensus_level)
+from verifikasi import model_weights
+
+# Buletin periode (DINI HARI/PAGI/SIANG/MALAM) untuk banyak titik tanpa Streamlit.
+# Memakai logika tabel & konsensus yang sama dengan dashboard:
+#   multi-model (mainkode.py/semuakota.py) atau ensemble (app_cuaca.py).
+#
+#   python buletin.py --stasiun stasiun.csv --mode model --format csv,json,html
+#   python buletin.py --mode ensemble --hari 3 --keluar buletin/
+#
+# pandas hanya diimpor bila dipakai (mode model, keluaran CSV/HTML); mode
+# ensemble dengan keluaran JSON cukup NumPy.
+
+FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+ENSEMBLE_URL = "https://ensemble-api.open-meteo.com/v1/ensemble"
+
+# Sama dengan konfigurasi model di dashboard
+MODEL_DETERMINISTIK = {
+    "ecmwf_ifs": "Eropa", "gfs_seamless": "Amerika S.", "jma_seamless": "Jepang",
+    "icon_seamless": "Jerman", "gem_seamless": "Kanada", "meteofrance_seamless": "Prancis",
+    "ukmo_seamless": "Inggris"
+}
+MODEL_ENSEMBLE = {
+    "ecmwf_ifs025_ensemble": "Uni Eropa",
+    "ncep_gefs025": "Amerika Serikat",
+    "ukmo_global_ensemble_20km": "Inggris Raya",
+    "icon_global_eps": "Jerman",
+    "gem_global_ensemble": "Kanada"
+}
+VAR_DETERMINISTIK = ["temperature_2m", "relative_humidity_2m", "wind_speed_10m",
+                     "wind_direction_10m", "weather_code", "precipitation_probability", "precipitation"]
+VAR_ENSEMBLE = ["temperature_2m", "relative_humidity_2m", "precipitation",
+                "weather_code", "wind_speed_10m", "wind_direction_10m"]
+FORMATS = ("csv", "json", "html")
+
+
+def load_stations(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return [dict(r, lat=float(r["lat"]), lon=float(r["lon"])) for r in csv.DictReader(f)]
+
+
+def build_params(mode, stasiun, days):
+    models = MODEL_DETERMINISTIK if mode == "model" else MODEL_ENSEMBLE
+    return {
+        "latitude": stasiun["lat"], "longitude": stasiun["lon"],
+        "hourly": VAR_DETERMINISTIK if mode == "model" else VAR_ENSEMBLE,
+        "models": list(models),
+        "timezone": stasiun["timezone"],
+        # Satu hari cadangan agar periode hari terakhir tetap lengkap
+        "forecast_days": days + 1
+    }
+
+
+# --- 1. BULETIN SATU STASIUN ---
+def _plain(msg):
+    return msg.replace("**", "")
+
+
+def bulletin_model(res, now, days, lokasi=None):
+    # lokasi (lat, lon): konsensus berbobot skill verifikasi bila tersedia
+    import pandas as pd
+    df = pd.DataFrame(res["hourly"])
+    df['time'] = pd.to_datetime(df['time']).dt.tz_localize(None)
+    period_index = build_period_index(df['time'].to_numpy())
+
+    periode = []
+    for start_h, end_h, label, t_date in build_periods(now, days=days):
+        if (t_date, label) not in period_index: continue
+        start, stop = period_index[t_date, label]
+        rows, kategori = model_period_rows(df.iloc[start:stop], MODEL_DETERMINISTIK)
+        bobot = model_weights(lokasi, t_date, label, MODEL_DETERMINISTIK) if lokasi else None
+        msg, tingkat = analyze_consensus(kategori, bobot)
+        if bobot is not None: msg += " (berbobot skill)"
+        periode.append({"tanggal": t_date.isoformat(), "periode": label, "jam": f"{start_h:02d}-{end_h:02d}",
+                        "konsensus": _plain(msg), "tingkat": tingkat, "tabel": rows})
+    return periode
+
+
+def bulletin_ensemble(res, now, days):
+    cube = parse_ensemble(res["hourly"], list(MODEL_ENSEMBLE))
+    periode = []
+    for per in aggregate_periods(cube, build_periods(now, days=days)):
+        if per is None: continue
+        rows = ensemble_period_rows(per, MODEL_ENSEMBLE, with_confidence=True, rain_label="Hujan (mm)")
+        msg, warna = get_consensus_level(per["member_cat"])
+        total_max = float(max(per["max_p"]))
+        periode.append({
+            "tanggal": per["date"].isoformat(), "periode": per["label"],
+            "jam": f"{per['start_h']:02d}-{per['end_h']:02d}",
+            "konsensus": msg, "tingkat": warna,
+            "peringatan": f"PERINGATAN DINI: potensi hujan, estimasi maks {total_max:.1f} mm" if total_max >= 5.0
+                          else f"AMAN: kondisi cenderung stabil (maks {total_max:.1f} mm)",
+            "tabel": rows,
+        })
+    return periode
+
+
+def _bulletin_job(args):
+    mode, stasiun, res, days, bobot_skill = args
+    now = datetime.now(pytz.timezone(stasiun["timezone"]))
+    hasil = dict(stasiun, dibuat=now.strftime('%Y-%m-%d %H:%M'))
+    if not res or "hourly" not in res:
+        return dict(hasil, galat=(res or {}).get("reason", "data tidak tersedia"), periode=[])
+    try:
+        if mode == "model":
+            lokasi = (stasiun["lat"], stasiun["lon"]) if bobot_skill else None
+            return dict(hasil, periode=bulletin_model(res, now, days, lokasi))
+        return dict(hasil, periode=bulletin_ensemble(res, now, days))
+    except Exception as e:
+        return dict(hasil, galat=str(e), periode=[])
+
+
+def build_bulletins(mode, stasiun_list, days=2, workers=1, stale_ok=True, bobot_skill=False):
+    url = FORECAST_URL if mode == "model" else ENSEMBLE_URL
+    res_list = fetch_json_many(url, [build_params(mode, s, days) for s in stasiun_list], stale_ok=stale_ok)
+    jobs = [(mode, s, res, days, bobot_skill) for s, res in zip(stasiun_list, res_list)]
+    if workers <= 1: return [_bulletin_job(j) for j in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_bulletin_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+
+# --- 2. PENULIS KELUARAN ---
+def write_json(bulletins, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(bulletins, f, ensure_ascii=False, indent=1)
+
+
+def write_csv(bulletins, path):
+    # Satu baris per stasiun x periode x model
+    import pandas as pd
+    records = []
+    for b in bulletins:
+        for p in b["periode"]:
+            for row in p["tabel"]:
+                records.append({"Stasiun": b["nama"], "Tanggal": p["tanggal"], "Periode": p["periode"],
+                                "Jam": p["jam"], **row, "Konsensus": p["konsensus"],
+                                **({"Peringatan": p["peringatan"]} if "peringatan" in p else {})})
+    pd.DataFrame(records).to_csv(path, index=False, encoding="utf-8")
+
+
+def write_html(bulletins, path, judul):
+    import pandas as pd
+    parts = [f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{html.escape(judul)}</title>",
+             "<style>body{font-family:sans-serif;margin:2em}table{border-collapse:collapse;margin-bottom:.5em}"
+             "td,th{border:1px solid #ccc;padding:2px 8px}h2{margin-top:2em}.galat{color:#b00}</style>",
+             f"</head><body><h1>{html.escape(judul)}</h1>"]
+    for b in bulletins:
+        parts.append(f"<h2>{html.escape(b['nama'])}</h2><p>{b['lat']}, {b['lon']} | dibuat {b['dibuat']}</p>")
+        if b.get("galat"): parts.append(f"<p class='galat'>⚠️ {html.escape(b['galat'])}</p>")
+        for p in b["periode"]:
+            parts.append(f"<h3>📅 {p['periode']} ({p['jam']}) | {p['tanggal']}</h3>")
+            parts.append(pd.DataFrame(p["tabel"]).to_html(index=False, border=0))
+            parts.append(f"<p>🤝 {html.escape(p['konsensus'])}</p>")
+            if "peringatan" in p: parts.append(f"<p>{html.escape(p['peringatan'])}</p>")
+    parts.append("</body></html>")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(parts))
+
+
+# --- 3. CLI ---
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Buletin prakiraan per periode untuk banyak stasiun")
+    ap.add_argument("--stasiun", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "stasiun.csv"),
+                    help="CSV dengan kolom nama,lat,lon,timezone")
+    ap.add_argument("--mode", choices=("model", "ensemble"), default="model")
+    ap.add_argument("--hari", type=int, default=2, help="jumlah hari buletin (default 2, seperti dashboard)")
+    ap.add_argument("--format", default="csv,json,html")
+    ap.add_argument("--keluar", default="buletin", help="direktori keluaran")
+    ap.add_argument("--proses", type=int, default=1, help="jumlah proses untuk menyusun tabel")
+    ap.add_argument("--segar", action="store_true", help="wajib data run terbaru (tanpa cache basi)")
+    ap.add_argument("--bobot-skill", action="store_true", help="konsensus multi-model berbobot skill verifikasi")
+    args = ap.parse_args(argv)
+
+    formats = [f.strip() for f in args.format.split(",") if f.strip()]
+    for f in formats:
+        if f not in FORMATS: ap.error(f"format tidak dikenal: {f}")
+
+    stasiun_list = load_stations(args.stasiun)
+    t0 = time.perf_counter()
+    bulletins = build_bulletins(args.mode, stasiun_list, args.hari, args.proses, stale_ok=not args.segar,
+                                bobot_skill=args.bobot_skill)
+
+    os.makedirs(args.keluar, exist_ok=True)
+    stem = os.path.join(args.keluar, f"buletin_{args.mode}_{datetime.now().strftime('%Y%m%d_%H%M')}")
+    judul = f"Buletin Prakiraan Cuaca ({'Multi-Model' if args.mode == 'model' else 'Ensemble'})"
+    for f in formats:
+        if f == "csv": write_csv(bulletins, stem + ".csv")
+        elif f == "json": write_json(bulletins, stem + ".json")
+        else: write_html(bulletins, stem + ".html", judul)
+        print(f"Ditulis: {stem}.{f}")
+
+    gagal = [b["nama"] for b in bulletins if b.get("galat")]
+    print(f"{len(bulletins)} stasiun dalam {time.perf_counter() - t0:.1f} detik"
+          + (f"; gagal: {', '.join(gagal)}" if gagal else ""))
+    return 1 if len(gagal) == len(bulletins) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,259 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from jadwal_model import run_slot
+
+# Cache prakiraan di disk (SQLite), dipakai bersama oleh semua dashboard dan
+# semua proses worker Streamlit. Kunci = endpoint + koordinat + variabel +
+# model + jam run model terakhir, sehingga restart / scale-out tidak memicu
+# rentetan panggilan API yang identik selama run model belum berganti.
+
+CACHE_DIR = os.environ.get("CUACA_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache_cuaca"))
+DB_PATH = os.path.join(CACHE_DIR, "prakiraan.sqlite")
+
+MAX_AGE_DAYS = 3          # entri lebih tua dari ini dibuang
+LEASE_SECONDS = 90        # batas waktu satu proses memegang hak fetch
+WAIT_SECONDS = 60         # lama proses lain menunggu hasil fetch yang sedang berjalan
+REQUEST_TIMEOUT = 60
+BATCH_SIZE = 20           # koordinat per permintaan multi-lokasi Open-Meteo
+MAX_WORKERS = 4           # permintaan paralel maksimum
+SCHEMA_VERSION = 2        # naikkan bila skema tabel berubah; cache lama dibuang
+
+
+# --- 1. KONEKSI & SKEMA ---
+def _connect():
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    con = sqlite3.connect(DB_PATH, timeout=30)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA busy_timeout=30000")
+    if con.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+        with con:
+            con.execute("DROP TABLE IF EXISTS responses")
+            con.execute("DROP TABLE IF EXISTS leases")
+            con.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    con.execute("""CREATE TABLE IF NOT EXISTS responses (
+        key TEXT PRIMARY KEY, base TEXT NOT NULL, run TEXT NOT NULL,
+        fetched_at REAL NOT NULL, version TEXT NOT NULL, payload BLOB NOT NULL)""")
+    con.execute("CREATE INDEX IF NOT EXISTS responses_base ON responses (base, fetched_at)")
+    con.execute("""CREATE TABLE IF NOT EXISTS leases (
+        key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires REAL NOT NULL)""")
+    return con
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    # Satu requests.Session per proses: koneksi keep-alive dipakai ulang, retry otomatis
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=MAX_WORKERS * 2, max_retries=retry)
+            _session = requests.Session()
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+
+# --- 2. KUNCI CACHE ---
+def _canonical(params):
+    norm = {}
+    for k, v in params.items():
+        if k in ("latitude", "longitude"):
+            v = round(float(v), 4)
+        elif isinstance(v, (list, tuple)):
+            v = ",".join(str(x) for x in v)
+        norm[k] = v
+    return json.dumps(norm, sort_keys=True, separators=(",", ":"))
+
+
+def cache_key(url, params, now=None):
+    base = f"{url}?{_canonical(params)}"
+    models = params.get("models", [])
+    if isinstance(models, str): models = models.split(",")
+    run = run_slot(models, now).strftime("%Y-%m-%dT%H")
+    return base, run, f"{base}#{run}"
+
+
+# --- 3. BACA / TULIS ---
+def _load(con, key):
+    row = con.execute("SELECT payload FROM responses WHERE key = ?", (key,)).fetchone()
+    return json.loads(zlib.decompress(row[0])) if row else None
+
+
+def _load_latest(con, base):
+    row = con.execute("SELECT payload FROM responses WHERE base = ? ORDER BY fetched_at DESC LIMIT 1",
+                      (base,)).fetchone()
+    return json.loads(zlib.decompress(row[0])) if row else None
+
+
+def _is_fresh(con, key):
+    return con.execute("SELECT 1 FROM responses WHERE key = ?", (key,)).fetchone() is not None
+
+
+def _store(con, key, base, run, payload):
+    blob = zlib.compress(json.dumps(payload, separators=(",", ":")).encode(), 6)
+    version = hashlib.sha1(blob).hexdigest()[:16]
+    with con:
+        con.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, base, run, time.time(), version, blob))
+        con.execute("DELETE FROM responses WHERE fetched_at < ?", (time.time() - MAX_AGE_DAYS * 86400,))
+
+
+def _archive(url, params, run, payload):
+    # Run baru juga ditambahkan ke arsip historis (arsip.py); CUACA_ARSIP=0 mematikan.
+    # Gangguan arsip tidak boleh menggagalkan fetch.
+    if os.environ.get("CUACA_ARSIP", "1") != "1": return
+    try:
+        import arsip
+        arsip.append_run(url, params, run, payload)
+    except Exception:
+        pass
+
+
+def _acquire(con, key, owner):
+    now = time.time()
+    with con:
+        con.execute("DELETE FROM leases WHERE key = ? AND expires < ?", (key, now))
+        con.execute("INSERT OR IGNORE INTO leases VALUES (?, ?, ?)", (key, owner, now + LEASE_SECONDS))
+        row = con.execute("SELECT owner FROM leases WHERE key = ?", (key,)).fetchone()
+    return row is not None and row[0] == owner
+
+
+def _release(con, key, owner):
+    with con:
+        con.execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, owner))
+
+
+# --- 4. FETCH DENGAN CACHE ---
+def data_version(url, params):
+    # Versi (hash) respons terbaru yang tersimpan untuk permintaan ini, tanpa akses jaringan
+    base, _, _ = cache_key(url, params)
+    con = _connect()
+    try:
+        row = con.execute("SELECT version FROM responses WHERE base = ? ORDER BY fetched_at DESC LIMIT 1",
+                          (base,)).fetchone()
+        return row[0] if row else None
+    finally:
+        con.close()
+
+
+def is_fresh(url, params, now=None):
+    _, _, key = cache_key(url, params, now)
+    con = _connect()
+    try:
+        return _is_fresh(con, key)
+    finally:
+        con.close()
+
+
+def fetch_json(url, params, now=None, session=None, stale_ok=False):
+    # stale_ok=True: jika run terbaru belum ada di cache tetapi run sebelumnya ada,
+    # langsung kembalikan yang lama (penyegaran diserahkan ke prefetch di latar belakang)
+    base, run, key = cache_key(url, params, now)
+    con = _connect()
+    try:
+        hit = _load(con, key)
+        if hit is not None: return hit
+        if stale_ok:
+            stale = _load_latest(con, base)
+            if stale is not None: return stale
+
+        # Hanya satu proses yang mengunduh; yang lain menunggu hasilnya
+        owner = uuid.uuid4().hex
+        if not _acquire(con, key, owner):
+            deadline = time.time() + WAIT_SECONDS
+            while time.time() < deadline:
+                time.sleep(0.5)
+                hit = _load(con, key)
+                if hit is not None: return hit
+            _acquire(con, key, owner)
+
+        try:
+            try:
+                res = (session or get_session()).get(url, params=params, timeout=REQUEST_TIMEOUT).json()
+            except (requests.RequestException, ValueError):
+                # Gangguan jaringan: pakai run terakhir yang masih tersimpan
+                stale = _load_latest(con, base)
+                if stale is not None: return stale
+                raise
+            if isinstance(res, dict) and res.get("error"):
+                # Payload galat API ({"error": true, "reason": ...}): run lama lebih berguna
+                stale = _load_latest(con, base)
+                if stale is not None: return stale
+                return res
+            if isinstance(res, dict):
+                _store(con, key, base, run, res)
+                _archive(url, params, run, res)
+            return res
+        finally:
+            _release(con, key, owner)
+    finally:
+        con.close()
+
+
+# --- 5. FETCH BANYAK LOKASI ---
+def _fetch_batch(url, params_list, session):
+    # Open-Meteo menerima banyak koordinat sekaligus (dipisah koma) dan mengembalikan list
+    params = dict(params_list[0])
+    params["latitude"] = ",".join(str(p["latitude"]) for p in params_list)
+    params["longitude"] = ",".join(str(p["longitude"]) for p in params_list)
+    res = session.get(url, params=params, timeout=REQUEST_TIMEOUT).json()
+    if isinstance(res, dict):
+        if res.get("error"): raise ValueError(res.get("reason", "Open-Meteo error"))
+        res = [res]
+    return res
+
+
+def fetch_json_many(url, params_list, stale_ok=False, batch_size=BATCH_SIZE, max_workers=MAX_WORKERS):
+    # Hasil per lokasi disimpan dengan kunci lokasi masing-masing, sehingga
+    # halaman satu lokasi dan ringkasan multi-lokasi memakai cache yang sama
+    keys = [cache_key(url, p) for p in params_list]
+    results = [None] * len(params_list)
+    con = _connect()
+    try:
+        missing = []
+        for i, (base, _, key) in enumerate(keys):
+            hit = _load(con, key)
+            if hit is None and stale_ok: hit = _load_latest(con, base)
+            if hit is None: missing.append(i)
+            results[i] = hit
+
+        # Kelompokkan yang belum ada menurut parameter selain koordinat, lalu pecah per batch
+        groups = {}
+        for i in missing:
+            rest = {k: v for k, v in params_list[i].items() if k not in ("latitude", "longitude")}
+            groups.setdefault(_canonical(rest), []).append(i)
+        batches = [idxs[j:j + batch_size] for idxs in groups.values() for j in range(0, len(idxs), batch_size)]
+
+        session = get_session()
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = [(batch, pool.submit(_fetch_batch, url, [params_list[i] for i in batch], session))
+                       for batch in batches]
+            for batch, fut in futures:
+                try:
+                    payloads = fut.result()
+                except (requests.RequestException, ValueError):
+                    for i in batch: results[i] = _load_latest(con, keys[i][0])
+                    continue
+                for i, payload in zip(batch, payloads):
+                    base, run, key = keys[i]
+                    _store(con, key, base, run, payload)
+                    _archive(url, params_list[i], run, payload)
+                    results[i] = payload
+        return results
+    finally:
+        con.close()
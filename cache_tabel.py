@@ -0,0 +1,49 @@
+import threading
+from collections import OrderedDict
+
+# Cache hasil render tabel periode (DataFrame + pesan konsensus/peringatan) di
+# memori proses, dipakai bersama oleh semua sesi. Kunci: (versi respons, tanggal,
+# periode, varian app), jadi selama satu siklus model render ulang cukup mengambil
+# tabel yang sudah jadi. Ukuran dibatasi dengan pengusiran LRU.
+
+MAX_ENTRIES = 512     # ~ lokasi x periode x app yang aktif dalam satu siklus
+
+
+class LRUCache:
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+        # Dibangun di luar lock; bila dua sesi membangun bersamaan, hasilnya identik
+        value = build()
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+        return value
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_tables = LRUCache()
+
+
+def cached_table(versi, t_date, label, app, build):
+    # Tanpa versi (cache respons belum ada) tabel tidak di-cache
+    if versi is None: return build()
+    return _tables.get_or_build((versi, t_date, label, app), build)
@@ -0,0 +1,158 @@
+import bisect
+import csv
+import os
+import re
+import sqlite3
+import time
+import unicodedata
+
+import requests
+
+from cache_prakiraan import CACHE_DIR, get_session
+
+# Pencarian koordinat untuk get_coordinates: nama persis di gazetteer offline
+# kabupaten/kota/distrik Indonesia (indeks terurut di memori) lebih dulu, lalu
+# cache geocode persisten, lalu API geocoding Open-Meteo. Awalan nama ("palangka"
+# -> Palangka Raya) hanya jalan terakhir bila API tidak menemukan/terputus, dan
+# hanya kata utuh yang menunjuk satu tempat: "Bali" tidak boleh jadi "Balikpapan".
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gazetteer_id.csv")
+GEOCODE_DB = os.path.join(CACHE_DIR, "geocode.sqlite")
+GEOCODE_URL = "https://geocoding-api.open-meteo.com/v1/search"
+
+MAX_ENTRIES = 2000               # batas entri cache geocode (LRU)
+NEGATIVE_TTL = 24 * 3600         # nama yang tidak ditemukan dicoba ulang setelah sehari
+MIN_PREFIX = 3
+
+_PREFIKS_JENIS = {"kabupaten": "kabupaten", "kab": "kabupaten", "kota": "kota",
+                  "kecamatan": "kecamatan", "kec": "kecamatan", "distrik": "distrik"}
+_PRIORITAS_JENIS = {"kota": 0, "kabupaten": 1, "distrik": 2, "kecamatan": 2}
+
+
+# --- 1. NORMALISASI NAMA ---
+def normalize_name(name):
+    # "Kab. Jayawijaya " -> ("jayawijaya", "kabupaten")
+    name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode().lower()
+    words = re.sub(r"[^a-z0-9]+", " ", name).split()
+    jenis = None
+    if len(words) > 1 and words[0] in _PREFIKS_JENIS:
+        jenis = _PREFIKS_JENIS[words.pop(0)]
+    return " ".join(words), jenis
+
+
+# --- 2. GAZETTEER OFFLINE ---
+_entries = None
+_keys = None
+
+
+def _load_gazetteer():
+    global _entries, _keys
+    if _entries is None:
+        with open(GAZETTEER_PATH, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        index = []
+        for i, r in enumerate(rows):
+            key = normalize_name(r["nama"])[0]
+            # Varian tanpa spasi juga diindeks ("palangkaraya" -> "Palangka Raya")
+            for k in {key, key.replace(" ", "")}:
+                index.append((k, _PRIORITAS_JENIS.get(r["jenis"], 3), i))
+        index.sort()
+        _entries = (rows, index)
+        _keys = [k for k, _, _ in index]
+    return _entries
+
+
+def _match_range(key, prefix=False):
+    lo = bisect.bisect_left(_keys, key)
+    hi = bisect.bisect_right(_keys, key)
+    if prefix and lo == hi and len(key) >= MIN_PREFIX:
+        # Tidak ada yang sama persis: rentang semua kunci berawalan `key`; lookup_offline
+        # menyaringnya ke awalan kata utuh ("palangka" -> "palangka raya", "wam" tidak cocok)
+        hi = bisect.bisect_left(_keys, key + "\x7f", lo)
+    return lo, hi
+
+
+def _display_name(r):
+    if r["jenis"] == "kabupaten": return f"Kab. {r['nama']}"
+    if r["jenis"] == "kota": return f"Kota {r['nama']}"
+    return r["nama"]
+
+
+def lookup_offline(name, prefix=False):
+    # prefix=True: bila tidak ada nama persis, awalan kata utuh diterima asal menunjuk satu tempat
+    rows, index = _load_gazetteer()
+    key, jenis = normalize_name(name)
+    if not key: return None
+
+    lo, hi = _match_range(key, prefix)
+    if lo == hi: lo, hi = _match_range(key.replace(" ", ""), prefix)
+    kandidat = index[lo:hi]
+    if prefix and kandidat and kandidat[0][0] not in (key, key.replace(" ", "")):
+        # Awalan: hanya kata utuh ("palangka" -> "palangka raya") yang menunjuk satu tempat
+        kandidat = [t for t in kandidat if t[0][len(key):len(key) + 1] == " "]
+        if len({(rows[i]["nama"], rows[i]["induk"]) for _, _, i in kandidat}) != 1: return None
+    if not kandidat: return None
+
+    # Jenis yang diketik ("kab", "kota") diutamakan, lalu nama terpendek, lalu kota > kabupaten > distrik
+    best = min(kandidat, key=lambda t: (rows[t[2]]["jenis"] != jenis if jenis else False, len(t[0]), t[1]))
+    r = rows[best[2]]
+    return float(r["lat"]), float(r["lon"]), _display_name(r), r["timezone"]
+
+
+# --- 3. CACHE GEOCODE PERSISTEN ---
+def _connect():
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    con = sqlite3.connect(GEOCODE_DB, timeout=30)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("""CREATE TABLE IF NOT EXISTS geocode (
+        key TEXT PRIMARY KEY, lat REAL, lon REAL, nama TEXT, tz TEXT, used REAL NOT NULL)""")
+    return con
+
+
+def _cache_get(con, key):
+    row = con.execute("SELECT lat, lon, nama, tz, used FROM geocode WHERE key = ?", (key,)).fetchone()
+    if row is None: return None
+    if row[0] is None:
+        # Hasil negatif tidak diperbarui waktunya, agar kedaluwarsa setelah NEGATIVE_TTL
+        return row[:4] if time.time() - row[4] <= NEGATIVE_TTL else None
+    with con:
+        con.execute("UPDATE geocode SET used = ? WHERE key = ?", (time.time(), key))
+    return row[:4]
+
+
+def _cache_put(con, key, value):
+    lat, lon, nama, tz = value
+    with con:
+        con.execute("INSERT OR REPLACE INTO geocode VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, lat, lon, nama, tz, time.time()))
+        con.execute("""DELETE FROM geocode WHERE key NOT IN (
+            SELECT key FROM geocode ORDER BY used DESC LIMIT ?)""", (MAX_ENTRIES,))
+
+
+# --- 4. GEOCODE ---
+def geocode(name):
+    hit = lookup_offline(name)
+    if hit is not None: return hit
+
+    key = " ".join(x for x in normalize_name(name)[::-1] if x)
+    con = _connect()
+    try:
+        cached = _cache_get(con, key)
+        if cached is not None and cached[0] is not None: return tuple(cached)
+
+        value = (None, None, None, None)
+        if cached is None:
+            params = {"name": name, "count": 1, "language": "id", "format": "json"}
+            try:
+                res = get_session().get(GEOCODE_URL, params=params, timeout=15).json()
+                if "results" in res:
+                    data = res["results"][0]
+                    value = (data["latitude"], data["longitude"], data["name"], data.get("timezone", "Asia/Jayapura"))
+                _cache_put(con, key, value)
+            except (requests.RequestException, ValueError):
+                pass
+        if value[0] is not None: return value
+    finally:
+        con.close()
+    # Jalan terakhir: awalan unik di gazetteer (nama diketik sebagian, atau API terputus)
+    return lookup_offline(name, prefix=True) or value
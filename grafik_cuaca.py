@@ -0,0 +1,92 @@
+import warnings
+
+import numpy as np
+
+# Seri grafik tren dashboard multi-model (mainkode.py, semuakota.py), disusun
+# sekali per versi data langsung dari respons JSON: rata-rata antar model, pita
+# sebaran (min/max antar model) dan garis per model. Horizon panjang diperkecil
+# di server sebelum dikirim ke browser: LTTB pada rata-rata + titik min/max pita
+# tiap ember, sehingga puncak & lembah tetap terlihat dengan ~MAX_TITIK baris.
+
+MAX_TITIK = 240
+
+
+def _lttb(y, n_out):
+    # Largest-Triangle-Three-Buckets: indeks titik yang paling menjaga bentuk kurva
+    n = len(y)
+    if n_out >= n or n_out < 3: return np.arange(n)
+    y = np.where(np.isnan(y), np.nanmean(y) if np.isfinite(y).any() else 0.0, y)
+    x = np.arange(n, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)     # n_out-2 ember di antara titik ujung
+    hasil = np.empty(n_out, dtype=np.intp)
+    hasil[0], hasil[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Titik acuan kanan: rata-rata ember berikutnya (ember terakhir -> titik akhir)
+        if i + 2 < len(edges):
+            cx, cy = x[hi:edges[i + 2]].mean(), y[hi:edges[i + 2]].mean()
+        else:
+            cx, cy = x[-1], y[-1]
+        luas = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(luas.argmax())
+        hasil[i + 1] = a
+    return hasil
+
+
+def _minmax(lo, hi, n_bins):
+    # Indeks minimum `lo` & maksimum `hi` pada tiap ember (NaN diabaikan)
+    edges = np.linspace(0, len(lo), n_bins + 1).astype(np.intp)
+    hasil = []
+    for a, b in zip(edges[:-1], edges[1:]):
+        if b <= a: continue
+        if np.isfinite(lo[a:b]).any(): hasil.append(a + int(np.nanargmin(lo[a:b])))
+        if np.isfinite(hi[a:b]).any(): hasil.append(a + int(np.nanargmax(hi[a:b])))
+    return np.array(hasil, dtype=np.intp)
+
+
+def decimate_indices(y, lo=None, hi=None, n_out=MAX_TITIK):
+    # Indeks baris yang dikirim ke grafik: semua bila sudah kecil, selain itu
+    # LTTB pada y ditambah min/max pita per ember (sepertiga anggaran masing-masing)
+    n = len(y)
+    if n <= n_out: return np.arange(n)
+    if lo is None: return _lttb(y, n_out)
+    idx = np.concatenate([_lttb(y, n_out // 3), _minmax(lo, hi, n_out // 3)])
+    return np.unique(idx)
+
+
+def _block(hourly, var, models, n):
+    # (jam, model) float; model tanpa kolom -> NaN
+    kosong = [None] * n
+    return np.array([hourly.get(f"{var}_{m}", kosong) for m in models], dtype=np.float64).T
+
+
+def chart_series(hourly, models, start, hours, n_out=MAX_TITIK):
+    # (df_suhu, df_peluang) mulai jam `start` sepanjang `hours` jam, berindeks waktu.
+    # df_suhu: Rata-rata, Min/Maks antar model, lalu satu kolom per model.
+    import pandas as pd
+    times = np.array(hourly["time"], dtype="datetime64[m]")
+    n = len(times)
+    a = max(int(np.searchsorted(times, np.datetime64(start, "m"), side="right")) - 1, 0)
+    sl = slice(a, min(a + hours, len(times)))
+    times = times[sl]
+    temp = _block(hourly, "temperature_2m", models, n)[sl]
+    prob = _block(hourly, "precipitation_probability", models, n)[sl]
+
+    with warnings.catch_warnings():
+        # Jam tanpa data dari semua model sah terjadi di ujung horizon
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        t_mean, t_min, t_max = np.nanmean(temp, axis=1), np.nanmin(temp, axis=1), np.nanmax(temp, axis=1)
+        p_mean, p_max = np.nanmean(prob, axis=1), np.nanmax(prob, axis=1)
+
+    idx = decimate_indices(t_mean, t_min, t_max, n_out)
+    # Peluang hujan: LTTB pada maks + ember max sehingga puncak peluang tidak hilang
+    idx_p = decimate_indices(p_max, p_max, p_max, n_out)
+    waktu = pd.DatetimeIndex(times.astype("datetime64[ns]"), name="time")
+
+    df_suhu = pd.DataFrame({"Rata-rata": t_mean, "Min antar model": t_min, "Maks antar model": t_max,
+                            **{m.split('_')[0].upper(): temp[:, i] for i, m in enumerate(models)}},
+                           index=waktu).iloc[idx].round(1)
+    df_peluang = pd.DataFrame({"Peluang Hujan Maks (%)": p_max, "Rata-rata Model (%)": p_mean},
+                              index=waktu).iloc[idx_p].round(0)
+    return df_suhu, df_peluang
@@ -0,0 +1,731 @@
+import warnings
+from datetime import timedelta
+
+import numpy as np
+
+# Inti pengolahan data ensemble (hanya bergantung pada NumPy).
+# Payload `hourly` diubah sekali menjadi kubus kolumnar bertipe ringkas
+# (satu array per variabel berbentuk model x anggota x waktu), lalu seluruh
+# statistik per periode dihitung sekaligus sehingga kode tabel di dashboard
+# tinggal memformat angka.
+
+ENSEMBLE_VARS = ["temperature_2m", "relative_humidity_2m", "precipitation",
+                 "weather_code", "wind_speed_10m", "wind_direction_10m"]
+
+# Tipe penyimpanan per variabel; nilai hilang pada tipe integer memakai sentinel
+VAR_DTYPES = {"weather_code": np.int8, "wind_direction_10m": np.uint16}
+DEFAULT_DTYPE = np.float32
+SENTINEL = {np.dtype(np.int8): -1, np.dtype(np.uint16): np.iinfo(np.uint16).max}
+
+URUTAN_WAKTU = [(0, 6, "DINI HARI"), (6, 12, "PAGI"), (12, 18, "SIANG"), (18, 24, "MALAM")]
+
+
+# --- 1. PARSING PAYLOAD ---
+def _parse_member_suffix(suffix, model_pos, single_model):
+    # Sisa nama kolom setelah "<variabel>_": "<model>", "memberNN_<model>",
+    # atau (respons satu model) "" / "memberNN"
+    member = 0
+    if suffix.startswith("member"):
+        num, _, suffix = suffix[6:].partition("_")
+        if not num.isdigit(): return None
+        member = int(num)
+    if suffix in model_pos: return model_pos[suffix], member
+    if suffix == "" and single_model: return 0, member
+    return None
+
+
+def build_member_index(columns, models, variables=ENSEMBLE_VARS):
+    # Peta (variabel, model, nomor anggota) -> posisi kolom; kontrol = anggota 0.
+    # Nama dicocokkan utuh, sehingga "precipitation" tidak ikut menangkap
+    # "precipitation_probability" dan ID model yang saling berawalan tetap terpisah.
+    model_pos = {m: i for i, m in enumerate(models)}
+    single_model = len(models) == 1
+    index = {}
+    for pos, col in enumerate(columns):
+        for v in variables:
+            if col == v:
+                parsed = (0, 0) if single_model else None
+            elif col.startswith(v + "_"):
+                parsed = _parse_member_suffix(col[len(v) + 1:], model_pos, single_model)
+            else:
+                continue
+            if parsed is not None:
+                index[v, models[parsed[0]], parsed[1]] = pos
+                break
+    return index
+
+
+def parse_ensemble(hourly, models, variables=ENSEMBLE_VARS):
+    columns = list(hourly.keys())
+    values = list(hourly.values())
+    times = np.array(hourly["time"], dtype="datetime64[m]")
+    index = build_member_index(columns, models, variables)
+
+    model_pos = {m: i for i, m in enumerate(models)}
+    n_slot = max((k for _, _, k in index), default=0) + 1
+    member_mask = np.zeros((len(models), n_slot), dtype=bool)
+    data = {}
+    for v in variables:
+        dtype = np.dtype(VAR_DTYPES.get(v, DEFAULT_DTYPE))
+        fill = SENTINEL.get(dtype, np.nan)
+        data[v] = np.full((len(models), n_slot, len(times)), fill, dtype=dtype)
+    for (v, m, k), pos in index.items():
+        col = np.array(values[pos], dtype=np.float64)
+        arr = data[v]
+        if arr.dtype.kind in "iu":
+            col = np.where(np.isnan(col), SENTINEL[arr.dtype], np.rint(col))
+        arr[model_pos[m], k] = col
+        member_mask[model_pos[m], k] = True
+
+    return {
+        "time": times,
+        "models": list(models),
+        "variables": list(variables),
+        "index": index,
+        "member_mask": member_mask,
+        "n_member": member_mask.sum(axis=1),
+        "periods": build_period_index(times),
+        "data": data,
+    }
+
+
+def as_float(arr):
+    # Potongan array bertipe ringkas -> float64 dengan NaN untuk nilai hilang
+    if arr.dtype.kind in "iu":
+        out = arr.astype(np.float64)
+        out[arr == SENTINEL[arr.dtype]] = np.nan
+        return out
+    return arr.astype(np.float64)
+
+
+# --- 2. DAFTAR PERIODE ---
+def build_periods(now, days=2, grace_minutes=0):
+    pilihan_rentang = []
+    for i in range(days):
+        dt = (now + timedelta(days=i)).date()
+        for s, e, lbl in URUTAN_WAKTU:
+            if dt == now.date():
+                if now.hour < e or (now.hour == e and now.minute < grace_minutes):
+                    pilihan_rentang.append((s, e, lbl, dt))
+            else:
+                pilihan_rentang.append((s, e, lbl, dt))
+    return pilihan_rentang
+
+
+def build_period_index(times):
+    # (tanggal, label periode) -> (start, stop) pada sumbu waktu yang terurut.
+    # Dihitung sekali per fetch; setiap tampilan periode cukup memotong [start:stop].
+    times = np.asarray(times).astype("datetime64[m]")
+    if times.size == 0: return {}
+    days = times.astype("datetime64[D]")
+    hours = (times - days).astype("timedelta64[h]").astype(np.int64)
+    starts = np.array([s for s, _, _ in URUTAN_WAKTU])
+    bucket = days.astype(np.int64) * len(starts) + np.searchsorted(starts, hours, side="right") - 1
+    edges = np.concatenate(([0], np.flatnonzero(np.diff(bucket)) + 1, [bucket.size]))
+
+    index = {}
+    for a, b in zip(edges[:-1], edges[1:]):
+        label = URUTAN_WAKTU[int(bucket[a] % len(starts))][2]
+        index[days[a].item(), label] = (int(a), int(b))
+    return index
+
+
+# --- 3. AGREGASI PER PERIODE ---
+def period_codes(code):
+    # Histogram kode cuaca seluruh anggota & jam per model (model, anggota, jam) dalam
+    # satu bincount atas indeks tabel kode -> (modus, terburuk) per model, NaN bila
+    # tidak ada kode. Modus: seri -> kode terkecil. Terburuk: keparahan tertinggi
+    # (KEPARAHAN_KODE), seri -> kode terbesar.
+    n_model = len(code)
+    idx = code_index(code).reshape(n_model, -1) % (N_KODE + 1)      # hilang -> slot N_KODE
+    offset = np.arange(n_model)[:, None] * (N_KODE + 1)
+    counts = np.bincount((idx + offset).ravel(), minlength=n_model * (N_KODE + 1))
+    counts = counts.reshape(n_model, N_KODE + 1)[:, :N_KODE]
+
+    ada = counts.any(axis=1)
+    modus = counts.argmax(axis=1)
+    skor = np.where(counts > 0, KEPARAHAN_KODE[:N_KODE].astype(np.intp) * N_KODE + np.arange(N_KODE), -1)
+    terburuk = skor.argmax(axis=1)
+    return np.where(ada, modus, np.nan), np.where(ada, terburuk, np.nan)
+
+
+# sin/cos arah bulat 0-360 (uint16 di kubus); indeks 361 = nilai hilang (sentinel) -> 0
+_ARAH_RAD = np.deg2rad(np.arange(361))
+_SIN_ARAH = np.append(np.sin(_ARAH_RAD), 0.0)
+_COS_ARAH = np.append(np.cos(_ARAH_RAD), 0.0)
+
+
+def _unit_vectors(wd):
+    # (sin, cos, valid); arah hilang memberi vektor nol sehingga jumlahan tidak perlu masking
+    if wd.dtype.kind in "iu":
+        # Arah bertipe integer cukup lewat tabel, tanpa trigonometri per elemen
+        idx = np.minimum(wd, 361)
+        return _SIN_ARAH[idx], _COS_ARAH[idx], idx < 361
+    valid = ~np.isnan(wd)
+    rad = np.deg2rad(np.where(valid, wd, 0.0))
+    return np.sin(rad) * valid, np.cos(rad) * valid, valid
+
+
+def wind_stats(ws, wd, axis):
+    # Rata-rata vektor angin sepanjang `axis`: arah resultan (derajat asal angin),
+    # kecepatan resultan, dan sebaran arah (simpangan baku sirkular dalam derajat,
+    # dari vektor satuan). 350° dan 10° menghasilkan 0°, bukan 180°.
+    sin_d, cos_d, valid_d = _unit_vectors(wd)
+    ws = np.asarray(ws, dtype=np.float64)
+    valid_s = ~np.isnan(ws)
+    ws = np.where(valid_s, ws, 0.0)
+
+    # Kecepatan hilang -> vektor nol; rata-rata atas pasangan yang lengkap saja
+    n_uv = (valid_d & valid_s).sum(axis=axis)
+    n_uv = np.where(n_uv > 0, n_uv, np.nan)
+    u = (ws * sin_d).sum(axis=axis) / n_uv
+    v = (ws * cos_d).sum(axis=axis) / n_uv
+    speed = np.hypot(u, v)
+    # Resultan ~0 (mis. angin berlawanan arah sama kuat) tidak punya arah
+    direction = np.where(speed > 1e-6, np.rad2deg(np.arctan2(u, v)).round(6) % 360, np.nan)
+
+    n_d = valid_d.sum(axis=axis)
+    r = np.hypot(sin_d.sum(axis=axis), cos_d.sum(axis=axis)) / np.where(n_d > 0, n_d, np.nan)
+    # sqrt(-2 ln R) tak terbatas saat R -> 0 (angin tenang/saling meniadakan); 180° = tanpa arah dominan
+    spread = np.minimum(np.rad2deg(np.sqrt(np.maximum(-2 * np.log(np.clip(r, 1e-12, 1.0)), 0.0))), 180.0)
+    return direction, speed, spread
+
+
+def member_categories(code, member_sum, valid_member):
+    # Kategori per anggota (model, anggota) dari kode per jam (model, anggota, jam):
+    # kategori terbanyak sepanjang periode, bila seri yang lebih parah. Anggota tanpa
+    # kode memakai curahnya (seperti weather_category), anggota tidak valid -> -1.
+    kat = KATEGORI_KODE[code_index(code)]
+    counts = np.stack([(kat == k).sum(axis=2) for k in range(len(KATEGORI))], axis=-1)
+    modus = len(KATEGORI) - 1 - counts[..., ::-1].argmax(axis=-1)
+    cadangan = np.where(member_sum > 0.1, HUJAN, BERAWAN)
+    hasil = np.where(counts.any(axis=-1), modus, cadangan)
+    return np.where(valid_member, hasil, -1).astype(np.int8)
+
+
+def aggregate_periods(cube, periods, rain_threshold=0.5):
+    data = cube["data"]
+    n_member = cube["n_member"]
+    valid_member = cube["member_mask"]
+    period_index = cube.get("periods") or build_period_index(cube["time"])
+
+    hasil = []
+    for start_h, end_h, label, t_date in periods:
+        sl = period_index.get((t_date, label))
+        if sl is None:
+            hasil.append(None)
+            continue
+        jam = slice(*sl)
+
+        with warnings.catch_warnings():
+            # Model tanpa data (semua NaN) sah terjadi
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            # Setiap variabel: (model, anggota, jam)
+            temp = as_float(data["temperature_2m"][..., jam])
+            rh = as_float(data["relative_humidity_2m"][..., jam])
+            prec = as_float(data["precipitation"][..., jam])
+            ws = as_float(data["wind_speed_10m"][..., jam])
+            wd = data["wind_direction_10m"][..., jam]
+            code = as_float(data["weather_code"][..., jam])
+
+            # Spread internal suhu antar anggota, dirata-rata terhadap jam
+            temp_std = np.nanmean(np.nanstd(temp, axis=1, ddof=1), axis=1)
+
+            # Probabilitas hujan: fraksi anggota > ambang, dirata-rata per jam
+            n = np.where(n_member > 0, n_member, np.nan)
+            prob = np.nanmean((prec > rain_threshold).sum(axis=1) / n[:, None], axis=1) * 100
+
+            # Akumulasi per anggota & anggota terbasah
+            member_sum = np.where(valid_member, np.nansum(prec, axis=2), np.nan)
+            max_p = np.nanmax(member_sum, axis=1)
+
+            # Kode cuaca dominan & terburuk sepanjang periode, lalu kategori tiap anggota
+            code_modus, code_worst = period_codes(code)
+            member_cat = member_categories(code, member_sum, valid_member)
+
+            # Angin: rata-rata vektor seluruh anggota & jam per model
+            wd_mean, ws_vec, wd_spread = wind_stats(ws, wd, axis=(1, 2))
+
+            period = {
+                "label": label, "start_h": start_h, "end_h": end_h, "date": t_date,
+                "temp_min": np.nanmin(temp, axis=(1, 2)), "temp_max": np.nanmax(temp, axis=(1, 2)),
+                "temp_mean": np.nanmean(temp, axis=(1, 2)), "temp_std": temp_std,
+                "rh_min": np.nanmin(rh, axis=(1, 2)), "rh_max": np.nanmax(rh, axis=(1, 2)),
+                "ws_mean": np.nanmean(np.nanmean(ws, axis=2), axis=1),
+                "wd_mean": wd_mean, "ws_vec": ws_vec, "wd_spread": wd_spread,
+                "prob": prob,
+                "member_sum": member_sum,
+                "max_p": max_p,
+                "member_cat": member_cat,
+                "code": code_modus, "code_worst": code_worst,
+            }
+        hasil.append(period)
+    return hasil
+
+
+# --- 4. STATISTIK PROBABILISTIK ---
+PERSENTIL = (10, 50, 90)
+AMBANG_HUJAN = (1, 5, 10, 20, 50)          # mm per periode
+NAMA_SKENARIO = {2: ["Kering", "Basah"], 3: ["Kering", "Sedang", "Basah"]}
+
+
+def _segment_sums(arr, starts, stops):
+    # Jumlah & jumlah nilai valid per segmen [start, stop) sumbu waktu terakhir,
+    # semua segmen sekaligus lewat cumsum -> (..., segmen)
+    valid = ~np.isnan(arr)
+    cs = np.concatenate([np.zeros(arr.shape[:-1] + (1,)), np.cumsum(np.where(valid, arr, 0.0), axis=-1)], axis=-1)
+    cn = np.concatenate([np.zeros(arr.shape[:-1] + (1,), np.int64), np.cumsum(valid, axis=-1)], axis=-1)
+    return cs[..., stops] - cs[..., starts], cn[..., stops] - cn[..., starts]
+
+
+def _nan_percentile(x, q, axis):
+    # Setara np.nanpercentile (interpolasi linear) tetapi satu kali sort untuk semua
+    # irisan; np.nanpercentile memproses irisan satu per satu bila ada NaN
+    x = np.moveaxis(np.sort(x, axis=axis), axis, -1)            # NaN di ujung
+    n = (~np.isnan(x)).sum(axis=-1)
+    pos = (np.maximum(n, 1) - 1)[None] * (np.asarray(q, dtype=np.float64) / 100).reshape(-1, *([1] * n.ndim))
+    lo = np.floor(pos).astype(np.intp)
+    hi = np.minimum(lo + 1, np.maximum(n - 1, 0)[None])
+    v_lo = np.take_along_axis(x[None], lo[..., None], axis=-1)[..., 0]
+    v_hi = np.take_along_axis(x[None], hi[..., None], axis=-1)[..., 0]
+    hasil = v_lo + (v_hi - v_lo) * (pos - lo)
+    return np.where(n[None] > 0, hasil, np.nan)
+
+
+def _kmeans(x, k, iters=25):
+    # k-means Lloyd tervektorisasi; inisialisasi deterministik pada anggota di
+    # kuantil total hujan, sehingga hasil stabil antar rerun
+    order = np.argsort(x.sum(axis=1), kind="stable")
+    pos = ((np.arange(k) + 0.5) / k * len(order)).astype(int)
+    centroid = x[order[pos]].copy()
+    labels = np.zeros(len(x), dtype=np.intp)
+    for it in range(iters):
+        d = ((x[:, None, :] - centroid[None]) ** 2).sum(axis=2)
+        new = d.argmin(axis=1)
+        if it and np.array_equal(new, labels): break
+        labels = new
+        for j in range(k):
+            anggota = labels == j
+            if anggota.any(): centroid[j] = x[anggota].mean(axis=0)
+    return labels, centroid
+
+
+def ensemble_statistics(cube, periods, percentiles=PERSENTIL, thresholds=AMBANG_HUJAN,
+                        n_scenario=3, weights=None):
+    # Statistik per (periode, model) dari seluruh anggota sekaligus:
+    #   rain_q / temp_q   : persentil akumulasi hujan & suhu rata-rata anggota  (q, periode, model)
+    #   exceed            : % anggota dengan akumulasi >= ambang                 (periode, model, ambang)
+    #   exceed_pooled     : sama, seluruh anggota semua model digabung           (periode, ambang)
+    #   scenario_*        : pengelompokan anggota menjadi skenario menurut pola hujan antar periode
+    period_index = cube.get("periods") or build_period_index(cube["time"])
+    present = [(s, e, lbl, d) for s, e, lbl, d in periods if (d, lbl) in period_index]
+    if not present: return None
+    starts = np.array([period_index[d, lbl][0] for _, _, lbl, d in present])
+    stops = np.array([period_index[d, lbl][1] for _, _, lbl, d in present])
+
+    valid = cube["member_mask"]                                   # (model, anggota)
+    prec = as_float(cube["data"]["precipitation"])
+    temp = as_float(cube["data"]["temperature_2m"])
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        rain, _ = _segment_sums(prec, starts, stops)              # (model, anggota, periode)
+        rain = np.where(valid[..., None], rain, np.nan)
+        t_sum, t_n = _segment_sums(temp, starts, stops)
+        t_mean = np.where(valid[..., None] & (t_n > 0), t_sum / np.maximum(t_n, 1), np.nan)
+
+        q = np.asarray(percentiles, dtype=np.float64)
+        rain_q = _nan_percentile(rain, q, axis=1).transpose(0, 2, 1)
+        temp_q = _nan_percentile(t_mean, q, axis=1).transpose(0, 2, 1)
+
+        thr = np.asarray(thresholds, dtype=np.float64)
+        lewat = rain[..., None] >= thr                            # (model, anggota, periode, ambang)
+        n_valid = valid.sum(axis=1)                               # (model,)
+        count = lewat.sum(axis=1)                                 # (model, periode, ambang)
+        exceed = (count / np.where(n_valid > 0, n_valid, np.nan)[:, None, None] * 100).transpose(1, 0, 2)
+
+        # Gabungan: bobot per model (default 1 = setiap anggota satu suara)
+        w = np.ones(len(n_valid)) if weights is None else np.asarray(weights, dtype=np.float64)
+        exceed_pooled = (w[:, None, None] * count).sum(axis=0) / max((w * n_valid).sum(), 1e-12) * 100
+
+    # Skenario: fitur = log1p(hujan per periode) tiap anggota valid, semua model digabung
+    mi, ki = np.nonzero(valid)
+    labels = np.full(valid.shape, -1, dtype=np.intp)
+    centroid = np.full((n_scenario, len(present)), np.nan)
+    share = np.full((valid.shape[0], n_scenario), np.nan)
+    if len(mi) >= n_scenario:
+        fitur = np.log1p(np.nan_to_num(rain[mi, ki]))
+        lab, pusat = _kmeans(fitur, n_scenario)
+        # Urutkan skenario dari yang paling kering
+        urut = np.argsort(pusat.sum(axis=1), kind="stable")
+        peringkat = np.empty_like(urut)
+        peringkat[urut] = np.arange(n_scenario)
+        labels[mi, ki] = peringkat[lab]
+        centroid = np.expm1(pusat[urut])
+        onehot = labels[..., None] == np.arange(n_scenario)       # (model, anggota, skenario)
+        share = onehot.sum(axis=1) / np.where(n_valid > 0, n_valid, np.nan)[:, None] * 100
+
+    return {
+        "periods": [(lbl, d) for _, _, lbl, d in present],
+        "percentiles": tuple(percentiles), "thresholds": tuple(thresholds),
+        "rain_q": rain_q, "temp_q": temp_q,
+        "exceed": exceed, "exceed_pooled": exceed_pooled,
+        "scenario_names": NAMA_SKENARIO.get(n_scenario, [f"S{j + 1}" for j in range(n_scenario)]),
+        "scenario_labels": labels, "scenario_rain": centroid, "scenario_share": share,
+        "scenario_share_pooled": np.bincount(labels[labels >= 0], minlength=n_scenario) / max(len(mi), 1) * 100,
+    }
+
+
+# Horizon panjang (7-16 hari): ringkasan per blok 6-jam / harian
+AMBANG_HORIZON = (1, 10)                    # mm per blok
+
+
+def horizon_blocks(times, start, step_hours=24):
+    # Blok waktu berurutan selebar step_hours mulai `start` -> [(awal blok, start, stop)];
+    # blok yang tidak lengkap di ujung horizon dilewati
+    times = np.asarray(times).astype("datetime64[m]")
+    if times.size == 0: return []
+    awal = np.datetime64(start, "m")
+    step = np.timedelta64(step_hours, "h")
+    blok = (times - awal) // step
+    edges = np.concatenate(([0], np.flatnonzero(np.diff(blok)) + 1, [blok.size]))
+    return [(awal + blok[a] * step, int(a), int(b)) for a, b in zip(edges[:-1], edges[1:])
+            if blok[a] >= 0 and (times[b - 1] - times[a]) // np.timedelta64(1, "h") + 1 == step_hours]
+
+
+def horizon_summary(cube, start, step_hours=24, thresholds=AMBANG_HORIZON, weights=None):
+    # Ringkasan gabungan seluruh anggota per blok, dihitung blok demi blok: hanya potongan
+    # satu blok yang diubah ke float64, sehingga memori tetap sebesar satu blok walau
+    # horizon 16 hari (kubus mmap cukup dibaca per potongan).
+    data = cube["data"]
+    thr = np.asarray(thresholds, dtype=np.float64)
+
+    hasil = []
+    for awal, a, b in horizon_blocks(cube["time"], start, step_hours):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            temp = as_float(data["temperature_2m"][..., a:b])
+            prec = as_float(data["precipitation"][..., a:b])
+            code = as_float(data["weather_code"][..., a:b])
+
+            # Anggota berdata di blok ini: member_mask hanya berarti kolomnya ada, sedangkan
+            # model yang jangkauannya habis (mis. hari 7-10) berisi null -> jangan dihitung 0 mm
+            valid = cube["member_mask"] & np.isfinite(prec).any(axis=2)
+            # Bobot per anggota: default satu suara per anggota, atau bobot model dibagi rata ke anggotanya
+            if weights is None:
+                w = valid.astype(np.float64)
+            else:
+                w = np.asarray(weights, dtype=np.float64)[:, None] / np.maximum(valid.sum(axis=1, keepdims=True), 1) * valid
+            # Di luar jangkauan semua model: blok tidak ditampilkan
+            if w.sum() <= 0: continue
+
+            member_sum = np.where(valid, np.nansum(prec, axis=2), np.nan)   # (model, anggota)
+            t_min, t_max = np.nanmin(temp, axis=2)[valid], np.nanmax(temp, axis=2)[valid]
+            rain_q = _nan_percentile(member_sum[valid], PERSENTIL, axis=0)
+            exceed = (w[..., None] * (member_sum[..., None] >= thr)).sum(axis=(0, 1)) / w.sum() * 100
+
+            member_cat = member_categories(code, member_sum, valid)
+            share = category_shares(member_cat, weights)
+            kategori = int(share.argmax()) if share is not None else -1
+            # Kode gabungan (semua anggota dianggap satu "model"); modus diambil dari
+            # kode berkategori dominan agar kondisi sejalan dengan konsensus
+            code = code[valid][None]
+            dominan = np.where(KATEGORI_KODE[code_index(code)] == kategori, code, np.nan)
+            code_modus = period_codes(dominan)[0]
+            code_worst = period_codes(code)[1]
+
+        hasil.append({
+            "start": awal.astype(object), "hours": b - a,
+            "temp_lo": float(np.nanpercentile(t_min, 10)) if t_min.size else np.nan,
+            "temp_hi": float(np.nanpercentile(t_max, 90)) if t_max.size else np.nan,
+            "rain_q": rain_q, "exceed": exceed, "thresholds": tuple(thresholds),
+            "category": kategori,
+            "share": float(share.max()) if share is not None else np.nan,
+            "code": code_modus[0], "code_worst": code_worst[0],
+        })
+    return hasil
+
+
+# --- 5. TABEL KODE CUACA & ARAH ANGIN ---
+# Kamus kode WMO dashboard ensemble (app_cuaca.py, ecmwfensemble.py)
+KODE_CUACA_ENSEMBLE = {
+    0: "☀️ Cerah", 1: "🌤️ Cerah Berawan", 2: "⛅ Berawan", 3: "☁️ Mendung",
+    45: "🌫️ Kabut", 48: "🌫️ Kabut Berembun",
+    51: "🌦️ Gerimis Ringan", 53: "🌦️ Gerimis Sedang", 55: "🌧️ Gerimis Padat",
+    61: "🌧️ Hujan Ringan", 63: "🌧️ Hujan Sedang", 65: "🌧️ Hujan Lebat",
+    80: "🌦️ Hujan Lokal Rgn", 81: "🌧️ Hujan Lokal Sdng", 82: "⛈️ Hujan Lokal Lbt",
+    95: "⛈️ Badai Petir"
+}
+
+# Kamus kode WMO dashboard multi-model (mainkode.py, semuakota.py)
+KODE_CUACA_MODEL = {
+    0: "☀️ Cerah", 1: "🌤️ Cerah Berawan", 2: "⛅ Berawan", 3: "☁️ Mendung",
+    45: "🌫️ Kabut", 51: "🌦️ Gerimis Rgn", 53: "🌦️ Gerimis Sdng", 55: "🌧️ Gerimis Pdt",
+    61: "🌧️ Hujan Ringan", 63: "🌧️ Hujan Sedang", 65: "🌧️ Hujan Lebat",
+    80: "🌦️ Hujan Lokal", 81: "🌧️ Hujan Lokal S", 82: "⛈️ Hujan Lokal L",
+    95: "⛈️ Badai Petir", 96: "⛈️ Badai Petir + Es", 99: "⛈️ Badai Petir Berat"
+}
+
+# Kategori konsensus; nilai array kategori adalah indeks ke KATEGORI (-1 = tanpa data)
+CERAH, BERAWAN, HUJAN, BADAI = range(4)
+KATEGORI = ["Cerah", "Berawan", "Hujan", "Badai"]
+N_KODE = 100
+
+# (kategori, tingkat keparahan) untuk kode yang dipakai Open-Meteo.
+# Kode 1 "Cerah Berawan" tetap dihitung Berawan seperti pada klasifikasi lama.
+KODE_KATEGORI = {
+    0: (CERAH, 0), 1: (BERAWAN, 1), 2: (BERAWAN, 2), 3: (BERAWAN, 3), 45: (BERAWAN, 4), 48: (BERAWAN, 4),
+    51: (HUJAN, 5), 53: (HUJAN, 6), 55: (HUJAN, 7), 56: (HUJAN, 6), 57: (HUJAN, 7),
+    61: (HUJAN, 6), 63: (HUJAN, 8), 65: (HUJAN, 10), 66: (HUJAN, 7), 67: (HUJAN, 9),
+    71: (HUJAN, 6), 73: (HUJAN, 8), 75: (HUJAN, 10), 77: (HUJAN, 6),
+    80: (HUJAN, 6), 81: (HUJAN, 8), 82: (HUJAN, 10), 85: (HUJAN, 7), 86: (HUJAN, 9),
+    95: (BADAI, 11), 96: (BADAI, 12), 99: (BADAI, 13),
+}
+
+
+def _wmo_group(c):
+    # Kode lain 0-99 mengikuti kelompok tabel WMO 4677
+    if c in (17, 18, 19, 29) or 91 <= c <= 99: return BADAI, 11
+    if 20 <= c <= 27 or 50 <= c <= 90: return HUJAN, 5
+    if 4 <= c <= 16 or 28 <= c <= 49: return BERAWAN, 3
+    return CERAH, 0
+
+
+def _lookup_tables():
+    # Entri terakhir (indeks -1) dipakai untuk kode hilang / di luar 0-99
+    kategori = np.full(N_KODE + 1, -1, dtype=np.int8)
+    keparahan = np.full(N_KODE + 1, -1, dtype=np.int8)
+    for c in range(N_KODE):
+        kategori[c], keparahan[c] = KODE_KATEGORI.get(c) or _wmo_group(c)
+    desc_ens = np.array([KODE_CUACA_ENSEMBLE.get(c, f"Kode {c}") for c in range(N_KODE)] + ["-"], dtype=object)
+    desc_model = np.array([KODE_CUACA_MODEL.get(c, f"Kode {c}") for c in range(N_KODE)] + ["N/A"], dtype=object)
+    return kategori, keparahan, desc_ens, desc_model
+
+
+KATEGORI_KODE, KEPARAHAN_KODE, DESC_ENSEMBLE, DESC_MODEL = _lookup_tables()
+
+ARAH = np.array(['U', 'TL', 'T', 'TG', 'S', 'BD', 'B', 'BL', '-'], dtype=object)
+
+
+def code_index(codes):
+    # Kode cuaca (float, NaN = hilang) -> indeks tabel di atas; hilang / di luar 0-99 -> -1
+    codes = np.asarray(codes, dtype=np.float64)
+    valid = (codes >= 0) & (codes < N_KODE)
+    return np.where(valid, codes, -1).astype(np.intp)
+
+
+def weather_category(codes, rain=None):
+    kat = KATEGORI_KODE[code_index(codes)]
+    if rain is not None:
+        # Tanpa kode: Hujan/Berawan menurut curah, sama dengan deskripsi cadangan get_weather_desc
+        rain = np.asarray(rain, dtype=np.float64)
+        kat = np.where(kat < 0, np.where(rain > 0.1, HUJAN, BERAWAN), kat).astype(np.int8)
+    return kat
+
+
+def direction_index(deg):
+    # Arah (derajat) -> indeks 8 mata angin; NaN -> -1 ("-")
+    deg = np.asarray(deg, dtype=np.float64)
+    idx = np.floor((deg + 22.5) / 45) % 8
+    return np.where(np.isnan(idx), -1, idx).astype(np.intp)
+
+
+def directions(deg):
+    return ARAH[direction_index(deg)]
+
+
+# --- 6. DESKRIPSI & BARIS TABEL ---
+def get_weather_desc(code, rain_val=0):
+    if code is not None and not np.isnan(code):
+        c = int(code)
+        return DESC_ENSEMBLE[c] if 0 <= c < N_KODE else f"Kode {c}"
+    return "🌧️ Hujan" if rain_val > 0.1 else "☁️ Mendung"
+
+
+def get_model_weather_desc(code):
+    if code is None or np.isnan(code): return "N/A"
+    c = int(code)
+    return DESC_MODEL[c] if 0 <= c < N_KODE else f"Kode {c}"
+
+
+def get_confidence(std_val):
+    if std_val < 1.0: return "🟢 Tinggi"
+    elif std_val < 2.5: return "🟡 Sedang"
+    else: return "🔴 Rendah"
+
+
+def degrees_to_direction(deg):
+    if deg is None: return "-"
+    return ARAH[direction_index(deg)]
+
+
+def period_categories(per):
+    # Kategori per model untuk satu periode hasil aggregate_periods
+    return weather_category(per["code"], rain=per["max_p"])
+
+
+def ensemble_period_rows(per, model_info, with_confidence=False, with_country=False,
+                         rain_label="Curah Hujan (mm)"):
+    # Baris tabel satu periode dari hasil aggregate_periods (satu baris per model)
+    idx = code_index(per["code"])
+    cadangan = np.where(per["max_p"] > 0.1, "🌧️ Hujan", "☁️ Mendung")
+    desc = np.where(idx >= 0, DESC_ENSEMBLE[idx], cadangan)
+    # Kode terburuk disebut bila kategorinya lebih parah dari kondisi dominan
+    worst = code_index(per["code_worst"])
+    lebih_parah = (idx >= 0) & (KATEGORI_KODE[worst] > KATEGORI_KODE[idx])
+    desc = np.where(lebih_parah, desc + " (maks " + DESC_ENSEMBLE[worst] + ")", desc)
+    arah = directions(per["wd_mean"])
+
+    results = []
+    for mi, m in enumerate(model_info):
+        row = {"Model": m.split('_')[0].upper()}
+        if with_country: row["Negara"] = model_info[m]
+        row["Kondisi"] = desc[mi]
+        if with_confidence: row["Indeks Kepastian"] = get_confidence(per["temp_std"][mi])
+        row.update({
+            "Suhu (°C)": f"{per['temp_min'][mi]:.1f}-{per['temp_max'][mi]:.1f}",
+            "RH (%)": f"{int(per['rh_min'][mi])}-{int(per['rh_max'][mi])}",
+            "Angin (km/jam)": f"{per['ws_mean'][mi]:.1f} {arah[mi]}",
+            "Prob. Hujan": f"{per['prob'][mi]:.0f}%",
+            rain_label: round(per["max_p"][mi], 1)
+        })
+        results.append(row)
+    return results
+
+
+NAMA_HARI = ["Sen", "Sel", "Rab", "Kam", "Jum", "Sab", "Min"]
+
+
+def horizon_rows(blocks):
+    # Baris tabel horizon panjang dari horizon_summary (satu baris per blok)
+    rows = []
+    for blk in blocks:
+        waktu = blk["start"].strftime('%d %b') if blk["hours"] >= 24 else blk["start"].strftime('%d %b %H:%M')
+        idx, worst = code_index([blk["code"], blk["code_worst"]])
+        kondisi = DESC_ENSEMBLE[idx] if idx >= 0 else "-"
+        if idx >= 0 and KATEGORI_KODE[worst] > KATEGORI_KODE[idx]: kondisi += f" (maks {DESC_ENSEMBLE[worst]})"
+        p10, p50, p90 = blk["rain_q"]
+        row = {
+            "Waktu": f"{NAMA_HARI[blk['start'].weekday()]} {waktu}",
+            "Kondisi": kondisi,
+            "Suhu (°C)": f"{blk['temp_lo']:.1f}-{blk['temp_hi']:.1f}" if not np.isnan(blk["temp_lo"]) else "N/A",
+            "Hujan P50/P90 (mm)": f"{p50:.1f} / {p90:.1f}" if not np.isnan(p50) else "N/A",
+        }
+        for t, p in zip(blk["thresholds"], blk["exceed"]): row[f"Peluang ≥{t} mm"] = f"{p:.0f}%"
+        row["Konsensus"] = f"{blk['share'] * 100:.0f}% {KATEGORI[blk['category']]}" if blk["category"] >= 0 else "-"
+        rows.append(row)
+    return rows
+
+
+_VAR_MODEL = ["weather_code", "precipitation_probability", "temperature_2m", "relative_humidity_2m",
+              "precipitation", "wind_speed_10m", "wind_direction_10m"]
+
+
+def model_period_rows(df_kat, model_info, with_rh=True, rain_label="Curah Hujan (mm)"):
+    # Baris tabel satu periode dari potongan DataFrame model deterministik;
+    # mengembalikan (baris, kategori per model untuk analisis konsensus)
+    models = list(model_info)
+    # Satu kali ambil semua kolom -> (jam, variabel, model)
+    blok = df_kat[[f"{v}_{m}" for v in _VAR_MODEL for m in models]].to_numpy(dtype=np.float64)
+    blok = blok.reshape(len(df_kat), len(_VAR_MODEL), len(models))
+
+    def kolom(var):
+        return blok[:, _VAR_MODEL.index(var)]
+
+    with warnings.catch_warnings():
+        # Model tanpa data (semua NaN) sah terjadi
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        code = np.nanmax(kolom("weather_code"), axis=0)
+        prob = np.nan_to_num(np.nanmax(kolom("precipitation_probability"), axis=0))
+        temp, rh = kolom("temperature_2m"), kolom("relative_humidity_2m")
+        t_min, t_max = np.nanmin(temp, axis=0), np.nanmax(temp, axis=0)
+        rh_min, rh_max = np.nanmin(rh, axis=0), np.nanmax(rh, axis=0)
+        prec = np.nansum(kolom("precipitation"), axis=0)
+        w_spd = np.nanmean(kolom("wind_speed_10m"), axis=0)
+        w_dir = wind_stats(kolom("wind_speed_10m"), kolom("wind_direction_10m"), axis=0)[0]
+
+    idx = code_index(code)
+    desc = DESC_MODEL[idx]
+    arah = directions(w_dir)
+
+    data_tabel = []
+    for i, m in enumerate(models):
+        row = {
+            "Model": m.split('_')[0].upper(),
+            "Asal": model_info[m],
+            "Kondisi": desc[i],
+            "Suhu (°C)": f"{t_min[i]:.1f}-{t_max[i]:.1f}" if not np.isnan(t_min[i]) else "N/A",
+        }
+        if with_rh: row["RH (%)"] = f"{int(rh_min[i])}-{int(rh_max[i])}" if not np.isnan(rh_min[i]) else "N/A"
+        row.update({
+            "Prob. Hujan": f"{int(prob[i])}%",
+            rain_label: round(prec[i], 1),
+            "Angin (km/jam)": f"{w_spd[i]:.1f} {arah[i]}" if not np.isnan(w_spd[i]) else "N/A"
+        })
+        data_tabel.append(row)
+    return data_tabel, KATEGORI_KODE[idx]
+
+
+# --- 7. KONSENSUS ---
+# Kedua fungsi menerima array kategori per model (weather_category / period_categories);
+# get_consensus_level juga menerima kategori per anggota (model, anggota) ("member_cat")
+_KELOMPOK_ANALISIS = ["Cerah", "Berawan", "Hujan/Badai"]
+
+
+# Dashboard multi-model (mainkode.py, semuakota.py): persentase model yang sepakat,
+# Hujan & Badai digabung
+def analyze_consensus(kategori, weights=None):
+    # weights (opsional, per model): bobot skill dari verifikasi; tanpa bobot = satu suara per model
+    kat = np.asarray(kategori, dtype=np.intp)
+    w = np.ones(kat.size) if weights is None else np.asarray(weights, dtype=np.float64)
+    valid = kat >= 0
+    kat, w = kat[valid], w[valid]
+    if kat.size == 0 or w.sum() <= 0: return "⚠️ Data tidak cukup", "warning"
+    kat = np.where(kat == BADAI, HUJAN, kat)
+
+    counts = np.bincount(kat, weights=w, minlength=len(KATEGORI))
+    # Jika seri, kategori yang muncul lebih dulu menang (seperti Counter.most_common)
+    top = kat[np.flatnonzero(counts[kat] == counts.max())[0]]
+    most_common = _KELOMPOK_ANALISIS[top]
+    percentage = (counts[top] / w.sum()) * 100
+
+    if percentage >= 70:
+        return f"🟢 **Tinggi ({percentage:.0f}%)** - Model sangat kompak memprediksi {most_common}.", "success"
+    elif percentage >= 40:
+        return f"🟡 **Sedang ({percentage:.0f}%)** - Model cukup setuju pada kondisi {most_common}.", "info"
+    else:
+        return f"🔴 **Rendah ({percentage:.0f}%)** - Model berbeda pendapat. Wajib cek Satelit!", "warning"
+
+
+def category_shares(kategori, weights=None):
+    # Pangsa tiap kategori (len KATEGORI) dalam satu bincount berbobot.
+    # (model,): satu suara per model. (model, anggota): satu suara per anggota, jadi
+    # model beranggota banyak berbobot lebih besar. Bobot per model (opsional) dibagi
+    # rata ke anggota validnya sehingga total suara model = bobotnya.
+    kat = np.asarray(kategori, dtype=np.intp)
+    kat = kat.reshape(len(kat), -1)
+    valid = kat >= 0
+    if weights is None:
+        w = valid.astype(np.float64)
+    else:
+        n = np.maximum(valid.sum(axis=1, keepdims=True), 1)
+        w = np.asarray(weights, dtype=np.float64)[:, None] / n * valid
+    total = w.sum()
+    if total <= 0: return None
+    return np.bincount(np.where(valid, kat, 0).ravel(), weights=w.ravel(), minlength=len(KATEGORI)) / total
+
+
+# Dashboard ensemble (app_cuaca.py): porsi suara yang sepakat; ambang 80%/60%
+# setara 4/3 dari 5 model sebelumnya, berlaku untuk berapa pun jumlah model
+AMBANG_KUAT, AMBANG_SEDANG = 0.8, 0.6
+
+
+def get_consensus_level(kategori, weights=None):
+    share = category_shares(kategori, weights)
+    if share is None: return "🚨 LEMAH (Data tidak cukup)", "red"
+    top = int(share.argmax())
+    rinci = f" - {share[top] * 100:.0f}% {KATEGORI[top]}"
+
+    if share[top] >= AMBANG_KUAT: return "✅ KUAT (Model Kompak)" + rinci, "blue"
+    elif share[top] >= AMBANG_SEDANG: return "⚠️ SEDANG (Cukup Setuju)" + rinci, "orange"
+    else: return "🚨 LEMAH (Berbeda Pendapat)" + rinci, "red"
@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta, timezone
+
+# Jadwal rilis tipikal model di Open-Meteo: jam inisialisasi (UTC) dan jeda
+# sampai datanya tersedia di API. Dicocokkan dengan awalan ID model pada
+# `model_info` di setiap dashboard.
+JADWAL_MODEL = {
+    "ecmwf_ifs025_ensemble": {"runs": (0, 6, 12, 18), "delay_h": 8},
+    "ecmwf_ifs":             {"runs": (0, 6, 12, 18), "delay_h": 7},
+    "ncep_gefs":             {"runs": (0, 6, 12, 18), "delay_h": 6},
+    "gfs":                   {"runs": (0, 6, 12, 18), "delay_h": 4},
+    "icon_global_eps":       {"runs": (0, 6, 12, 18), "delay_h": 5},
+    "icon":                  {"runs": (0, 6, 12, 18), "delay_h": 4},
+    "gem_global_ensemble":   {"runs": (0, 12), "delay_h": 7},
+    "gem":                   {"runs": (0, 12), "delay_h": 5},
+    "ukmo_global_ensemble":  {"runs": (0, 6, 12, 18), "delay_h": 8},
+    "ukmo":                  {"runs": (0, 6, 12, 18), "delay_h": 6},
+    "jma":                   {"runs": (0, 6, 12, 18), "delay_h": 5},
+    "meteofrance":           {"runs": (0, 6, 12, 18), "delay_h": 5},
+}
+JADWAL_DEFAULT = {"runs": (0, 6, 12, 18), "delay_h": 6}
+
+
+def schedule_for(model):
+    # Awalan terpanjang yang cocok menang ("ecmwf_ifs025_ensemble" sebelum "ecmwf_ifs")
+    for prefix in sorted(JADWAL_MODEL, key=len, reverse=True):
+        if model.startswith(prefix): return JADWAL_MODEL[prefix]
+    return JADWAL_DEFAULT
+
+
+def _availability_times(model, around):
+    jadwal = schedule_for(model)
+    day = around.replace(hour=0, minute=0, second=0, microsecond=0)
+    for d in (-2, -1, 0, 1):
+        for h in jadwal["runs"]:
+            yield day + timedelta(days=d, hours=h + jadwal["delay_h"])
+
+
+def latest_available(model, now=None):
+    # Kapan run terbaru model ini mulai tersedia (UTC)
+    now = (now or datetime.now(timezone.utc)).astimezone(timezone.utc)
+    return max(t for t in _availability_times(model, now) if t <= now)
+
+
+def next_available(model, now=None):
+    # Kapan run berikutnya model ini diperkirakan tersedia (UTC)
+    now = (now or datetime.now(timezone.utc)).astimezone(timezone.utc)
+    return min(t for t in _availability_times(model, now) if t > now)
+
+
+def run_slot(models, now=None):
+    # Penanda versi gabungan: berganti setiap kali salah satu model merilis run baru
+    models = list(models) or ["default"]
+    return max(latest_available(m, now) for m in models)
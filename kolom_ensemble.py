@@ -0,0 +1,77 @@
+import json
+import os
+import shutil
+import time
+import uuid
+
+import numpy as np
+
+from cache_prakiraan import CACHE_DIR, MAX_AGE_DAYS
+from inti_cuaca import build_period_index
+
+# Penyimpanan kolumnar kubus ensemble: satu file .npy per variabel (float32,
+# int8 untuk kode cuaca, uint16 untuk arah angin) yang dibuka dengan mmap.
+# Semua proses worker membaca file yang sama lewat page cache OS tanpa salinan.
+
+KOLOM_DIR = os.path.join(CACHE_DIR, "kolom")
+
+
+def _path(version):
+    return os.path.join(KOLOM_DIR, version)
+
+
+def save_cube(version, cube):
+    final = _path(version)
+    if os.path.isdir(final): return final
+    os.makedirs(KOLOM_DIR, exist_ok=True)
+
+    # Tulis ke direktori sementara lalu rename, agar pembaca tidak melihat file setengah jadi
+    tmp = os.path.join(KOLOM_DIR, f".tmp-{version}-{uuid.uuid4().hex[:8]}")
+    os.makedirs(tmp)
+    np.save(os.path.join(tmp, "time.npy"), cube["time"])
+    np.save(os.path.join(tmp, "member_mask.npy"), cube["member_mask"])
+    for v, arr in cube["data"].items():
+        np.save(os.path.join(tmp, f"{v}.npy"), arr)
+    meta = {
+        "models": cube["models"],
+        "variables": cube["variables"],
+        "index": [[v, m, k, pos] for (v, m, k), pos in cube["index"].items()],
+    }
+    with open(os.path.join(tmp, "meta.json"), "w") as f:
+        json.dump(meta, f)
+    try:
+        os.rename(tmp, final)
+    except OSError:
+        # Proses lain sudah lebih dulu menyimpan versi yang sama
+        shutil.rmtree(tmp, ignore_errors=True)
+    _prune()
+    return final
+
+
+def load_cube(version):
+    path = _path(version)
+    if not os.path.isfile(os.path.join(path, "meta.json")): return None
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    member_mask = np.load(os.path.join(path, "member_mask.npy"))
+    times = np.load(os.path.join(path, "time.npy"))
+    return {
+        "time": times,
+        "models": meta["models"],
+        "variables": meta["variables"],
+        "index": {(v, m, k): pos for v, m, k, pos in meta["index"]},
+        "member_mask": member_mask,
+        "n_member": member_mask.sum(axis=1),
+        "periods": build_period_index(times),
+        "data": {v: np.load(os.path.join(path, f"{v}.npy"), mmap_mode="r") for v in meta["variables"]},
+    }
+
+
+def _prune():
+    batas = time.time() - MAX_AGE_DAYS * 86400
+    for name in os.listdir(KOLOM_DIR):
+        path = os.path.join(KOLOM_DIR, name)
+        try:
+            if os.path.getmtime(path) < batas: shutil.rmtree(path, ignore_errors=True)
+        except OSError:
+            pass
@@ -1,68 +1,41 @@
 import streamlit as st
-import requests
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import pytz
 from collections import Counter
-import folium
-from streamlit_folium import st_folium
+from cache_prakiraan import fetch_json, data_version
+import prefetch
+from gazetteer import geocode
+from inti_cuaca import build_period_index, get_model_weather_desc, model_period_rows, analyze_consensus
+from profil import Profil
+from cache_tabel import cached_table
+from grafik_cuaca import chart_series
+from verifikasi import model_weights
 
 # 1. Konfigurasi Halaman
 st.set_page_config(page_title="Dashboard Cuaca Smart System", layout="wide")
+prof = Profil("mainkode")
 
 # --- FUNGSI PENDUKUNG ---
+FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+
+def fetch_forecast(params):
+    # Run terbaru disegarkan oleh prefetch di latar belakang; render tidak menunggu jaringan
+    prefetch.ensure(FORECAST_URL, params)
+    return fetch_json(FORECAST_URL, params, stale_ok=True)
+
 def get_coordinates(city_name):
+    # Gazetteer offline -> cache geocode di disk -> API geocoding Open-Meteo
     try:
-        url = f"https://geocoding-api.open-meteo.com/v1/search?name={city_name}&count=1&language=id&format=json"
-        res = requests.get(url).json()
-        if "results" in res:
-            data = res["results"][0]
-            return data["latitude"], data["longitude"], data["name"], data.get("timezone", "Asia/Jayapura")
-        return None, None, None, None
+        return geocode(city_name)
     except:
         return None, None, None, None
 
-def get_weather_desc(code):
-    if code is None or np.isnan(code): return "N/A"
-    mapping = {
-        0: "☀️ Cerah", 1: "🌤️ Cerah Berawan", 2: "⛅ Berawan", 3: "☁️ Mendung",
-        45: "🌫️ Kabut", 51: "🌦️ Gerimis Rgn", 53: "🌦️ Gerimis Sdng", 55: "🌧️ Gerimis Pdt",
-        61: "🌧️ Hujan Ringan", 63: "🌧️ Hujan Sedang", 65: "🌧️ Hujan Lebat",
-        80: "🌦️ Hujan Lokal", 81: "🌧️ Hujan Lokal S", 82: "⛈️ Hujan Lokal L", 
-        95: "⛈️ Badai Petir", 96: "⛈️ Badai Petir + Es", 99: "⛈️ Badai Petir Berat"
-    }
-    return mapping.get(int(code), f"Kode {int(code)}")
-
-def degrees_to_direction(deg):
-    if deg is None or np.isnan(deg): return "-"
-    directions = ['U', 'TL', 'T', 'TG', 'S', 'BD', 'B', 'BL']
-    idx = int((deg + 22.5) / 45) % 8
-    return directions[idx]
-
-def analyze_consensus(conditions_list):
-    simplified_conds = []
-    for c in conditions_list:
-        if c == "N/A": continue
-        if "Hujan" in c or "Gerimis" in c or "Badai" in c:
-            simplified_conds.append("Hujan/Badai")
-        elif "Mendung" in c or "Berawan" in c:
-            simplified_conds.append("Berawan")
-        else:
-            simplified_conds.append("Cerah")
-    
-    if not simplified_conds: return "⚠️ Data tidak cukup", "warning"
-    
-    counts = Counter(simplified_conds)
-    most_common, num = counts.most_common(1)[0]
-    percentage = (num / len(simplified_conds)) * 100
-    
-    if percentage >= 70:
-        return f"🟢 **Tinggi ({percentage:.0f}%)** - Model sangat kompak memprediksi {most_common}.", "success"
-    elif percentage >= 40:
-        return f"🟡 **Sedang ({percentage:.0f}%)** - Model cukup setuju pada kondisi {most_common}.", "info"
-    else:
-        return f"🔴 **Rendah ({percentage:.0f}%)** - Model berbeda pendapat. Wajib cek Satelit!", "warning"
+def build_period_table(df_kat, weights=None):
+    # Tabel & konsensus satu periode; dibangun sekali per versi data (dan per bobot skill)
+    data_tabel, kategori = model_period_rows(df_kat, model_info)
+    return pd.DataFrame(data_tabel), analyze_consensus(kategori, weights)
 
 # --- SIDEBAR & LOGIKA PENENTUAN LOKASI ---
 try:
@@ -86,7 +59,8 @@ found_name = "Sentani (Stamet)"
 if pilihan == "Cari Lokasi Lain...":
     input_kota = st.sidebar.text_input("Ketik Nama Kota/Kecamatan:", placeholder="Contoh: Wamena")
     if input_kota:
-        lat, lon, found_name, tz_pilihan = get_coordinates(input_kota)
+        with prof.stage("geocode"):
+            lat, lon, found_name, tz_pilihan = get_coordinates(input_kota)
         if lat: st.sidebar.success(f"📍 Ditemukan: {found_name}")
         else:
             lat, lon, tz_pilihan = -2.5757, 140.5185, "Asia/Jayapura"
@@ -106,6 +80,16 @@ gmt_display = f"GMT+{int(gmt_offset[:3])}" if gmt_offset.startswith('+') else f"
 
 st.sidebar.info(f"🕒 **Waktu Lokal:**\n{now_local.strftime('%d %b %Y %H:%M:%S')} ({gmt_display})")
 
+# Rentang grafik tren; horizon panjang diperkecil di server (grafik_cuaca.py)
+RENTANG_GRAFIK = {"48 Jam": 48, "7 Hari": 168, "16 Hari": 384}
+st.sidebar.markdown("---")
+pilihan_grafik = st.sidebar.radio("📈 Rentang Grafik Tren", list(RENTANG_GRAFIK), horizontal=True)
+jam_grafik = RENTANG_GRAFIK[pilihan_grafik]
+garis_model = st.sidebar.checkbox("Tampilkan garis per model", value=False)
+# Konsensus berbobot skill dari verifikasi.py; tanpa data verifikasi tetap bobot sama
+bobot_skill = st.sidebar.checkbox("Konsensus berbobot skill model", value=False,
+                                  help="Bobot per model dari verifikasi terhadap observasi stasiun (lokasi, musim, periode)")
+
 st.sidebar.markdown("---")
 st.sidebar.subheader("🔗 Referensi Forecaster")
 st.sidebar.link_button("🌐 MJO, Gel. Ekuator (OLR)", "https://ncics.org/pub/mjo/v2/map/olr.cfs.all.indonesia.1.png")
@@ -132,32 +116,35 @@ params = {
                "wind_direction_10m", "weather_code", "precipitation_probability", "precipitation"],
     "models": list(model_info.keys()),
     "timezone": tz_pilihan,
-    "forecast_days": 3
+    "forecast_days": min(16, max(3, jam_grafik // 24 + 1))
 }
 
+# --- FETCH DATA: SATU RESPONS UNTUK PIN, GRAFIK & TABEL ---
+res, fetch_error = None, None
+try:
+    with prof.stage("fetch"):
+        res = fetch_forecast(params)
+        versi = data_version(FORECAST_URL, params)
+except Exception as e:
+    fetch_error = e
+
 # --- LOGIKA KONSENSUS PIN PETA ---
 pin_color = "green"
 worst_desc = "Cerah"
 
 try:
-    res_now = requests.get("https://api.open-meteo.com/v1/forecast", params={
-        "latitude": lat, "longitude": lon,
-        "hourly": ["weather_code"],
-        "models": list(model_info.keys()),
-        "timezone": tz_pilihan, "forecast_days": 1
-    }).json()
-    
+    # Jam pertama respons yang sama dengan tabel (weather_code sudah ada di params)
     current_codes = []
     for m in model_info.keys():
         key = f"weather_code_{m}"
-        if key in res_now["hourly"]:
-            val = res_now["hourly"][key][0]
-            if not np.isnan(val):
+        if key in res["hourly"]:
+            val = res["hourly"][key][0]
+            if val is not None and not np.isnan(val):
                 current_codes.append(int(val))
     
     if current_codes:
         most_common_code = Counter(current_codes).most_common(1)[0][0]
-        worst_desc = get_weather_desc(most_common_code)
+        worst_desc = get_model_weather_desc(most_common_code)
         max_code = max(current_codes)
         if max_code >= 95: pin_color = "red"
         elif max_code >= 51: pin_color = "blue"
@@ -170,6 +157,11 @@ except:
 st.title("🛰️ Dashboard Cuaca Smart Consensus System")
 st.markdown(f"Analisis Multi-Model Global untuk **{found_name}**")
 
+# folium + streamlit_folium butuh ~1 detik untuk diimpor; baru dimuat di sini
+# agar sidebar & judul sudah tampil lebih dulu saat proses baru dimulai
+import folium
+from streamlit_folium import st_folium
+
 m = folium.Map(location=[lat, lon], zoom_start=12)
 folium.Marker(
     [lat, lon], 
@@ -178,33 +170,35 @@ folium.Marker(
     icon=folium.Icon(color=pin_color, icon='cloud' if pin_color != 'green' else 'sun')
 ).add_to(m)
 
-st_folium(m, width=None, height=350, returned_objects=[])
+with prof.stage("peta"):
+    st_folium(m, width=None, height=350, returned_objects=[])
 st.markdown("---")
 
 # --- GRAFIK & TABEL ---
 try:
-    res = requests.get("https://api.open-meteo.com/v1/forecast", params=params).json()
-    df = pd.DataFrame(res["hourly"])
-    df['time'] = pd.to_datetime(df['time']).dt.tz_localize(None)
+    if fetch_error: raise fetch_error
+    with prof.stage("parse"):
+        df = pd.DataFrame(res["hourly"])
+        df['time'] = pd.to_datetime(df['time']).dt.tz_localize(None)
 
-    st.subheader(f"📊 Tren Cuaca 48 Jam Ke Depan ({gmt_display})")
+    st.subheader(f"📊 Tren Cuaca {pilihan_grafik} Ke Depan ({gmt_display})")
     col_chart1, col_chart2 = st.columns(2)
     
-    temp_cols = [f"temperature_2m_{m}" for m in model_info.keys()]
-    df_temp_chart = df[['time']].copy()
-    df_temp_chart['Suhu Rata-rata (°C)'] = df[temp_cols].mean(axis=1)
-    
-    prob_cols = [f"precipitation_probability_{m}" for m in model_info.keys()]
-    df_prob_chart = df[['time']].copy()
-    df_prob_chart['Peluang Hujan Maks (%)'] = df[prob_cols].max(axis=1)
-
-    with col_chart1:
-        st.write("**Grafik Fluktuasi Suhu (°C)**")
-        st.line_chart(df_temp_chart.set_index('time').head(48))
-
-    with col_chart2:
-        st.write("**Grafik Peluang Hujan (%)**")
-        st.area_chart(df_prob_chart.set_index('time').head(48))
+    with prof.stage("grafik"):
+        # Seri grafik (rata-rata, pita min/maks, garis per model) disusun sekali per versi data & jam mulai
+        jam_mulai = now_local.replace(minute=0, second=0, microsecond=0, tzinfo=None)
+        df_temp_chart, df_prob_chart = cached_table(
+            versi, jam_mulai, f"GRAFIK {jam_grafik}", "mainkode",
+            lambda: chart_series(res["hourly"], list(model_info), jam_mulai, jam_grafik))
+        kolom_suhu = list(df_temp_chart.columns) if garis_model else list(df_temp_chart.columns[:3])
+
+        with col_chart1:
+            st.write("**Grafik Fluktuasi Suhu (°C)**")
+            st.line_chart(df_temp_chart[kolom_suhu])
+
+        with col_chart2:
+            st.write("**Grafik Peluang Hujan (%)**")
+            st.area_chart(df_prob_chart)
     
     st.markdown("---")
 
@@ -218,50 +212,31 @@ try:
                 if now_local.hour < end_h: pilihan_rentang.append((start_h, end_h, label, date_target))
             else: pilihan_rentang.append((start_h, end_h, label, date_target))
 
-    for idx, (start_h, end_h, label, t_date) in enumerate(pilihan_rentang):
-        df_kat = df[(df['time'].dt.date == t_date) & (df['time'].dt.hour >= start_h) & (df['time'].dt.hour < end_h)]
-        if df_kat.empty: continue
+    with prof.stage("periode"):
+        # Indeks (tanggal, periode) -> baris [start, stop), dihitung sekali per versi data
+        period_index = cached_table(versi, None, "INDEKS PERIODE", "mainkode",
+                                    lambda: build_period_index(df['time'].to_numpy()))
+
+        for idx, (start_h, end_h, label, t_date) in enumerate(pilihan_rentang):
+            if (t_date, label) not in period_index: continue
+            start, stop = period_index[t_date, label]
         
-        with st.expander(f"📅 {label} ({start_h:02d}-{end_h:02d}) | {t_date.strftime('%d %B %Y')}", expanded=(idx < 4)):
-            data_tabel = []
-            conditions_for_analysis = []
-            
-            for m, negara in model_info.items():
-                raw_code = df_kat[f"weather_code_{m}"].max()
-                raw_prob = df_kat[f"precipitation_probability_{m}"].max()
-                code_val = raw_code if not np.isnan(raw_code) else None
-                prob_val = raw_prob if not np.isnan(raw_prob) else 0
-                desc = get_weather_desc(code_val)
-                conditions_for_analysis.append(desc)
-                
-                t_min, t_max = df_kat[f"temperature_2m_{m}"].min(), df_kat[f"temperature_2m_{m}"].max()
-                
-                # Pembaruan RH: Menampilkan Rentang (Min-Max)
-                rh_min, rh_max = df_kat[f"relative_humidity_2m_{m}"].min(), df_kat[f"relative_humidity_2m_{m}"].max()
-                
-                prec = df_kat[f"precipitation_{m}"].sum()
-                w_spd = df_kat[f"wind_speed_10m_{m}"].mean()
-                w_dir = df_kat[f"wind_direction_10m_{m}"].mean()
-
-                data_tabel.append({
-                    "Model": m.split('_')[0].upper(), 
-                    "Asal": negara, 
-                    "Kondisi": desc,
-                    "Suhu (°C)": f"{t_min:.1f}-{t_max:.1f}" if not np.isnan(t_min) else "N/A", 
-                    "RH (%)": f"{int(rh_min)}-{int(rh_max)}" if not np.isnan(rh_min) else "N/A",
-                    "Prob. Hujan": f"{int(prob_val)}%", 
-                    "Curah Hujan (mm)": round(np.nan_to_num(prec), 1), # Label kolom diubah
-                    "Angin (km/jam)": f"{w_spd:.1f} {degrees_to_direction(w_dir)}" if not np.isnan(w_spd) else "N/A"
-                })
+            with st.expander(f"📅 {label} ({start_h:02d}-{end_h:02d}) | {t_date.strftime('%d %B %Y')}", expanded=(idx < 4)):
+                bobot = model_weights((lat, lon), t_date, label, model_info) if bobot_skill else None
+                kunci = label if bobot is None else (label, tuple(bobot.round(3)))
+                df_tabel, (consensus_msg, msg_type) = cached_table(
+                    versi, t_date, kunci, "mainkode", lambda: build_period_table(df.iloc[start:stop], bobot))
+                if bobot is not None: consensus_msg += " _(berbobot skill)_"
             
-            st.table(pd.DataFrame(data_tabel))
-            consensus_msg, msg_type = analyze_consensus(conditions_for_analysis)
-            if msg_type == "success": st.success(f"🤝 **Tingkat Kepastian:** {consensus_msg}")
-            elif msg_type == "info": st.info(f"🤝 **Tingkat Kepastian:** {consensus_msg}")
-            else: st.warning(f"🤝 **Tingkat Kepastian:** {consensus_msg}")
+                st.table(df_tabel)
+                if msg_type == "success": st.success(f"🤝 **Tingkat Kepastian:** {consensus_msg}")
+                elif msg_type == "info": st.info(f"🤝 **Tingkat Kepastian:** {consensus_msg}")
+                else: st.warning(f"🤝 **Tingkat Kepastian:** {consensus_msg}")
 
 except Exception as e:
     st.error(f"⚠️ Terjadi gangguan data: {e}")
 
 st.markdown("---")
 st.markdown("<div style='text-align: center; color: gray; font-size: 0.8em;'>Copyright © 2026 Kedeng V | Stamet Sentani Smart Dashboard</div>", unsafe_allow_html=True)
+
+prof.finish()
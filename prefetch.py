@@ -0,0 +1,117 @@
+import random
+import threading
+from datetime import datetime, timedelta, timezone
+
+from cache_prakiraan import fetch_json, is_fresh
+from jadwal_model import next_available
+
+# Penyegar latar belakang: setiap permintaan yang pernah dipakai dashboard
+# didaftarkan di sini, lalu diunduh ulang ke cache disk begitu run model baru
+# diperkirakan tersedia. Render halaman cukup membaca cache (stale_ok=True)
+# sehingga tidak pernah menunggu jaringan kecuali cache masih kosong.
+
+JOB_EXPIRY_HOURS = 24     # permintaan yang tidak dipakai selama ini berhenti disegarkan
+RETRY_MINUTES = 10        # jeda coba ulang bila fetch gagal / run belum muncul
+MAX_JITTER_S = 120        # sebar beban antar proses worker
+
+
+class Prefetcher:
+    def __init__(self, fetch=fetch_json, fresh=is_fresh, clock=None, jitter_s=MAX_JITTER_S):
+        self._fetch = fetch
+        self._fresh = fresh
+        self._clock = clock or (lambda: datetime.now(timezone.utc))
+        self._jitter_s = jitter_s
+        self._jobs = {}               # kunci -> {url, params, models, last_seen, due}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # --- Pendaftaran ---
+    def register(self, url, params):
+        key = (url, repr(sorted((k, str(v)) for k, v in params.items())))
+        now = self._clock()
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None:
+                models = params.get("models", [])
+                if isinstance(models, str): models = models.split(",")
+                self._jobs[key] = {"url": url, "params": dict(params), "models": list(models),
+                                   "last_seen": now, "due": now}
+                self._wake.set()
+            else:
+                job["last_seen"] = now
+
+    # --- Penjadwalan ---
+    def _next_due(self, job, now):
+        models = job["models"] or ["default"]
+        nxt = min(next_available(m, now) for m in models)
+        return nxt + timedelta(seconds=random.uniform(0, self._jitter_s))
+
+    def run_pending(self):
+        # Satu putaran: segarkan semua job yang jatuh tempo, kembalikan waktu tunggu (detik)
+        now = self._clock()
+        with self._lock:
+            expired = [k for k, j in self._jobs.items()
+                       if now - j["last_seen"] > timedelta(hours=JOB_EXPIRY_HOURS)]
+            for k in expired: del self._jobs[k]
+            due = [j for j in self._jobs.values() if j["due"] <= now]
+
+        for job in due:
+            # Fetch di luar lock agar register() dari rerun dashboard tidak ikut menunggu
+            try:
+                if not self._fresh(job["url"], job["params"], now):
+                    self._fetch(job["url"], job["params"], now=now)
+                jatuh_tempo = self._next_due(job, now)
+            except Exception:
+                jatuh_tempo = now + timedelta(minutes=RETRY_MINUTES)
+            with self._lock:
+                job["due"] = jatuh_tempo
+
+        with self._lock:
+            if not self._jobs: return None
+            earliest = min(j["due"] for j in self._jobs.values())
+        return max((earliest - self._clock()).total_seconds(), 0.0)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            wait = self.run_pending()
+            self._wake.clear()
+            self._wake.wait(timeout=3600 if wait is None else min(wait, 3600))
+
+    # --- Siklus hidup thread ---
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="prefetch-cuaca", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None: self._thread.join(timeout)
+
+
+_prefetcher = None
+_prefetcher_lock = threading.Lock()
+
+
+def ensure(url, params):
+    # Dipanggil dashboard setiap rerun: satu thread per proses, daftar job bersama
+    global _prefetcher
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            _prefetcher = Prefetcher().start()
+    _prefetcher.register(url, params)
+
+
+if __name__ == "__main__":
+    # Mode mandiri untuk uji: python prefetch.py <url> <lat> <lon> <model,...> <var,...>
+    import sys
+    url, lat, lon, models, variables = sys.argv[1:6]
+    p = Prefetcher(jitter_s=0)
+    p.register(url, {"latitude": float(lat), "longitude": float(lon), "models": models.split(","),
+                     "hourly": variables.split(","), "forecast_days": 3})
+    wait = p.run_pending()
+    print(f"Prefetch selesai; penyegaran berikutnya dalam {wait / 60:.0f} menit.")
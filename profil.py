@@ -0,0 +1,169 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from cache_prakiraan import CACHE_DIR
+
+# Profil opsional untuk jalur panas dashboard: aktif dengan env CUACA_PROFIL=1
+# atau parameter URL ?profil=1. Setiap rerun mencatat durasi per tahap (fetch,
+# parse, peta, grafik, periode, ...), menampilkannya di sidebar, lalu
+# menambahkannya ke log metrik lokal untuk ringkasan persentil.
+#
+#   python profil.py [--jam 24]     # persentil latensi per app/tahap
+
+METRIK_PATH = os.path.join(CACHE_DIR, "metrik_profil.jsonl")
+MAX_LOG_BYTES = 20 * 2**20        # log diputar ke .1 setelah ~20 MB
+EKOR_MAKS = 5000                  # rekaman terakhir di memori untuk persentil sidebar
+PERSENTIL = (50, 90, 99)
+
+_ekor = None                      # deque rekaman terbaru; diisi sekali dari ujung log
+_ekor_lock = threading.Lock()
+
+
+def _enabled():
+    if os.environ.get("CUACA_PROFIL") == "1": return True
+    try:
+        import streamlit as st
+        return st.query_params.get("profil") == "1"
+    except Exception:
+        return False
+
+
+class Profil:
+    def __init__(self, app, enabled=None):
+        self.app = app
+        self.enabled = _enabled() if enabled is None else enabled
+        self.stages = {}
+        self._t0 = time.perf_counter()
+        self._done = False
+
+    @contextmanager
+    def stage(self, name):
+        if not self.enabled:
+            yield
+            return
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            # Tahap yang sama dalam satu rerun (mis. per periode) dijumlahkan
+            self.stages[name] = self.stages.get(name, 0.0) + (time.perf_counter() - t0) * 1000
+
+    def finish(self, target=None):
+        # Dipanggil sekali di akhir script (dan sebelum st.stop()). Di dalam fragment
+        # `target` = wadah di badan fragment, karena fragment tidak boleh menulis ke sidebar
+        if not self.enabled or self._done: return
+        self._done = True
+        total = (time.perf_counter() - self._t0) * 1000
+        record = {"app": self.app, "waktu": datetime.now().isoformat(timespec="seconds"),
+                  "total_ms": round(total, 2), "tahap": {k: round(v, 2) for k, v in self.stages.items()}}
+        try:
+            _append(record)
+        except OSError:
+            pass
+        self._render(record, target)
+
+    def _render(self, record, target=None):
+        import streamlit as st
+        target = target or st.sidebar
+        target.markdown("---")
+        target.subheader("⏱️ Profil Rerun")
+        total = record["total_ms"]
+        lain = total - sum(record["tahap"].values())
+        rows = [{"Tahap": k, "ms": v, "%": v / total * 100} for k, v in record["tahap"].items()]
+        rows.append({"Tahap": "lainnya", "ms": lain, "%": lain / total * 100})
+        rows.append({"Tahap": "TOTAL", "ms": total, "%": 100.0})
+        target.dataframe(rows, hide_index=True, column_config={
+            "ms": st.column_config.NumberColumn(format="%.1f"), "%": st.column_config.NumberColumn(format="%.0f")})
+
+        # Dari ekor di memori, bukan membaca ulang log tiap rerun / tick fragment
+        ringkas = _summarize(_recent(), self.app, hours=24).get(self.app)
+        if ringkas:
+            with target.expander(f"Persentil 24 jam ({ringkas['TOTAL']['n']} rerun)"):
+                st.dataframe([{"Tahap": k, **{f"p{p}": v[f"p{p}"] for p in PERSENTIL}} for k, v in ringkas.items()],
+                             hide_index=True)
+
+
+# --- LOG METRIK ---
+def _append(record):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    if os.path.exists(METRIK_PATH) and os.path.getsize(METRIK_PATH) > MAX_LOG_BYTES:
+        os.replace(METRIK_PATH, METRIK_PATH + ".1")
+    with open(METRIK_PATH, "a") as f:
+        f.write(json.dumps(record) + "\n")
+    with _ekor_lock:
+        if _ekor is not None: _ekor.append(record)
+
+
+def _parse(lines):
+    hasil = []
+    for line in lines:
+        try:
+            hasil.append(json.loads(line))
+        except ValueError:
+            continue
+    return hasil
+
+
+def _read_tail(path, n, blok=64 * 1024):
+    # n baris terakhir log, dibaca mundur per blok tanpa memindai seluruh file
+    if not os.path.exists(path): return []
+    with open(path, "rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        data = b""
+        while pos > 0 and data.count(b"\n") <= n:
+            step = min(blok, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    # Baris pertama bisa terpotong bila pembacaan berhenti di tengah file: gagal di-parse, dilewati
+    return _parse(data.splitlines()[-n:])
+
+
+def _recent():
+    # Rekaman terbaru proses ini (ditambah ekor log saat pertama dipakai), paling banyak EKOR_MAKS
+    global _ekor
+    with _ekor_lock:
+        if _ekor is None: _ekor = deque(_read_tail(METRIK_PATH, EKOR_MAKS), maxlen=EKOR_MAKS)
+        return list(_ekor)
+
+
+def _summarize(records, app=None, hours=24):
+    batas = (datetime.now() - timedelta(hours=hours)).isoformat(timespec="seconds")
+    nilai = {}
+    for r in records:
+        if r["waktu"] < batas or (app and r["app"] != app): continue
+        per_app = nilai.setdefault(r["app"], {})
+        for k, v in r["tahap"].items(): per_app.setdefault(k, []).append(v)
+        per_app.setdefault("TOTAL", []).append(r["total_ms"])
+
+    hasil = {}
+    for a, per_app in nilai.items():
+        hasil[a] = {}
+        for k, v in per_app.items():
+            q = np.percentile(v, PERSENTIL)
+            hasil[a][k] = {"n": len(v), **{f"p{p}": round(float(x), 1) for p, x in zip(PERSENTIL, q)}}
+    return hasil
+
+
+def percentiles(app=None, hours=24):
+    # {app: {tahap: {n, p50, p90, p99}}} dari rerun dalam `hours` jam terakhir (seluruh log, untuk CLI)
+    if not os.path.exists(METRIK_PATH): return {}
+    with open(METRIK_PATH) as f:
+        return _summarize(_parse(f), app, hours)
+
+
+if __name__ == "__main__":
+    import sys
+    jam = int(sys.argv[sys.argv.index("--jam") + 1]) if "--jam" in sys.argv else 24
+    for a, per_app in percentiles(hours=jam).items():
+        print(f"\n{a} ({per_app['TOTAL']['n']} rerun, {jam} jam terakhir)")
+        print(f"  {'tahap':<12} " + " ".join(f"{'p' + str(p):>9}" for p in PERSENTIL))
+        for k, v in per_app.items():
+            print(f"  {k:<12} " + " ".join(f"{v[f'p{p}']:>7.1f}ms" for p in PERSENTIL))
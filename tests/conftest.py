@@ -0,0 +1,29 @@
+import os
+import sys
+
+import pytest
+
+# Modul repo berada di akar (skrip datar, bukan paket)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    # Cache prakiraan terisolasi per test; arsip historis dimatikan
+    import cache_prakiraan
+    monkeypatch.setattr(cache_prakiraan, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(cache_prakiraan, "DB_PATH", str(tmp_path / "prakiraan.sqlite"))
+    monkeypatch.setenv("CUACA_ARSIP", "0")
+    return tmp_path
+
+
+@pytest.fixture
+def arsip_dir(tmp_path, monkeypatch):
+    # Indeks arsip & statistik verifikasi di direktori sementara
+    import arsip
+    import verifikasi
+    monkeypatch.setattr(arsip, "ARSIP_DIR", str(tmp_path))
+    monkeypatch.setattr(arsip, "INDEKS_PATH", str(tmp_path / "indeks.sqlite"))
+    monkeypatch.setattr(verifikasi, "VERIF_PATH", str(tmp_path / "verifikasi.sqlite"))
+    monkeypatch.setattr(verifikasi, "_BOBOT", {"versi": None, "tabel": {}})
+    return tmp_path
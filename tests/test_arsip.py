@@ -0,0 +1,90 @@
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+import numpy as np
+
+import arsip
+
+URL = "https://api.open-meteo.com/v1/forecast"
+PARAMS = {"latitude": -2.5757, "longitude": 140.5185, "models": ["ecmwf_ifs", "gfs_seamless"],
+          "hourly": ["temperature_2m", "precipitation"], "forecast_days": 2}
+LOKASI = arsip.resolve_location("Sentani")
+# Slot 03 & 05 UTC: ecmwf_ifs masih run 18Z kemarin, gfs sudah merilis run 00Z (tersedia 04 UTC)
+SLOT_A, SLOT_B = "2026-10-15T03", "2026-10-15T05"
+
+
+def _payload(dasar):
+    # Dua hari per jam (waktu lokal WIT); suhu = dasar + indeks jam sehingga tiap run bisa dikenali
+    t0 = datetime(2026, 10, 15)
+    n = 48
+    hourly = {"time": [(t0 + timedelta(hours=i)).strftime("%Y-%m-%dT%H:%M") for i in range(n)]}
+    for m in PARAMS["models"]:
+        hourly[f"temperature_2m_{m}"] = [dasar + i / 10 for i in range(n)]
+        hourly[f"precipitation_{m}"] = [0.5] * n
+    return {"utc_offset_seconds": 9 * 3600, "hourly": hourly}
+
+
+def test_model_init_uses_each_models_own_schedule():
+    assert arsip.model_init("ecmwf_ifs", SLOT_A) == arsip.model_init("ecmwf_ifs", SLOT_B) == "2026-10-14T18"
+    assert (arsip.model_init("gfs_seamless", SLOT_A), arsip.model_init("gfs_seamless", SLOT_B)) == \
+        ("2026-10-14T18", "2026-10-15T00")
+
+
+def test_append_is_idempotent_per_model_init(arsip_dir):
+    assert arsip.append_run(URL, PARAMS, SLOT_A, _payload(20.0)) == 4        # 2 tanggal x 2 model
+    assert arsip.append_run(URL, PARAMS, SLOT_A, _payload(20.0)) == 0
+    # Slot berikutnya: hanya gfs yang punya run baru; blok ecmwf_ifs tidak ditulis ulang
+    assert arsip.append_run(URL, PARAMS, SLOT_B, _payload(30.0)) == 2
+
+    segs = arsip.segments("Sentani", "2026-10-15", "2026-10-16")
+    assert sorted((s[1], s[2], s[3]) for s in segs) == [
+        ("2026-10-15", "ecmwf_ifs", "2026-10-14T18"),
+        ("2026-10-15", "gfs_seamless", "2026-10-14T18"), ("2026-10-15", "gfs_seamless", "2026-10-15T00"),
+        ("2026-10-16", "ecmwf_ifs", "2026-10-14T18"),
+        ("2026-10-16", "gfs_seamless", "2026-10-14T18"), ("2026-10-16", "gfs_seamless", "2026-10-15T00"),
+    ]
+    # File partisi ecmwf_ifs berisi tepat satu blok
+    ecmwf = next(s for s in segs if s[1:3] == ("2026-10-15", "ecmwf_ifs"))
+    assert os.path.getsize(os.path.join(arsip_dir, ecmwf[6])) == ecmwf[8]
+
+
+def test_query_returns_matching_block(arsip_dir):
+    arsip.append_run(URL, PARAMS, SLOT_A, _payload(20.0))
+    arsip.append_run(URL, PARAMS, SLOT_B, _payload(30.0))
+
+    hasil = arsip.query("Sentani", "2026-10-16", periode="SIANG", model="gfs_seamless")
+    assert [(r["init"], r["run"], r["jenis"]) for r in hasil] == [
+        ("2026-10-14T18", SLOT_A, "deterministik"), ("2026-10-15T00", SLOT_B, "deterministik")]
+    for r, dasar in zip(hasil, (20.0, 30.0)):
+        np.testing.assert_array_equal(r["jam"], np.arange(12, 18))
+        # Hari kedua, jam 12-17 -> indeks 36-41 pada payload
+        np.testing.assert_allclose(r["data"]["temperature_2m"][0], dasar + np.arange(36, 42) / 10, rtol=1e-6)
+        assert r["utc_offset"] == 9 * 3600 and list(r["anggota"]) == [0]
+
+    assert arsip.query("Sentani", "2026-10-17") == []
+    assert len(arsip.query("Sentani", "2026-10-15", jenis="ensemble")) == 0
+
+
+def test_migrates_old_run_keyed_index(arsip_dir):
+    # Indeks lama: dikunci slot gabungan, run ecmwf_ifs yang sama tersimpan dua kali
+    con = sqlite3.connect(arsip_dir / "indeks.sqlite")
+    con.execute("""CREATE TABLE segmen (
+        lokasi TEXT NOT NULL, tanggal TEXT NOT NULL, model TEXT NOT NULL, run TEXT NOT NULL,
+        jenis TEXT NOT NULL, utc_offset INTEGER NOT NULL, path TEXT NOT NULL,
+        offset INTEGER NOT NULL, panjang INTEGER NOT NULL, n_anggota INTEGER NOT NULL,
+        dibuat REAL NOT NULL, PRIMARY KEY (lokasi, tanggal, model, run)) WITHOUT ROWID""")
+    con.execute("CREATE INDEX segmen_tanggal ON segmen (tanggal, model)")
+    lama = [(SLOT_B, 100, 2.0), (SLOT_A, 0, 1.0), ("2026-10-15T09", 200, 3.0)]
+    con.executemany("INSERT INTO segmen VALUES (?, '2026-10-15', 'ecmwf_ifs', ?, 'deterministik', 32400, "
+                    "'2026-10-15/ecmwf_ifs/x.bin', ?, 100, 1, ?)", [(LOKASI, r, o, d) for r, o, d in lama])
+    con.commit()
+    con.close()
+
+    segs = sorted(arsip.segments("Sentani", "2026-10-15", "2026-10-15"), key=lambda s: s[3])
+    # Blok pertama (dibuat paling awal) dari tiap run model dipertahankan
+    assert [(s[3], s[7]) for s in segs] == [("2026-10-14T18", 0), ("2026-10-15T00", 200)]
+    con = sqlite3.connect(arsip_dir / "indeks.sqlite")
+    assert "init" in [r[1] for r in con.execute("PRAGMA table_info(segmen)")]
+    assert con.execute("SELECT run FROM segmen WHERE init = '2026-10-14T18'").fetchone() == (SLOT_A,)
+    con.close()
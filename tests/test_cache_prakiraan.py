@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta, timezone
+
+import cache_prakiraan
+
+URL = "https://api.open-meteo.com/v1/forecast"
+PARAMS = {"latitude": -2.5757, "longitude": 140.5185, "models": ["ecmwf_ifs"],
+          "hourly": ["temperature_2m"], "forecast_days": 3}
+MULAI = datetime(2026, 10, 15, 3, 0, tzinfo=timezone.utc)
+
+
+class _Session:
+    # Pengganti requests.Session: mengembalikan payload berurutan
+    def __init__(self, *payloads):
+        self.payloads = list(payloads)
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.calls += 1
+        payload = self.payloads.pop(0)
+        return type("R", (), {"json": lambda s: payload})()
+
+
+def test_fresh_hit_does_not_refetch(cache_dir):
+    s = _Session({"hourly": {"n": 1}})
+    assert cache_prakiraan.fetch_json(URL, PARAMS, now=MULAI, session=s) == {"hourly": {"n": 1}}
+    assert cache_prakiraan.fetch_json(URL, PARAMS, now=MULAI, session=s) == {"hourly": {"n": 1}}
+    assert s.calls == 1
+
+
+def test_error_payload_falls_back_to_stale(cache_dir):
+    s = _Session({"hourly": {"n": 1}}, {"error": True, "reason": "Too many requests"})
+    cache_prakiraan.fetch_json(URL, PARAMS, now=MULAI, session=s)
+    # Run baru belum ada & API mengembalikan galat: run lama yang dipakai, galat tidak disimpan
+    nanti = MULAI + timedelta(hours=5)
+    assert cache_prakiraan.fetch_json(URL, PARAMS, now=nanti, session=s) == {"hourly": {"n": 1}}
+    assert not cache_prakiraan.is_fresh(URL, PARAMS, nanti)
+
+
+def test_error_payload_without_cache_is_returned(cache_dir):
+    galat = {"error": True, "reason": "Invalid model"}
+    assert cache_prakiraan.fetch_json(URL, PARAMS, now=MULAI, session=_Session(galat)) == galat
@@ -0,0 +1,40 @@
+import os
+
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+import cache_prakiraan
+import kolom_ensemble
+import prefetch
+from inti_cuaca import parse_ensemble
+from test_inti_cuaca import _payload
+
+AKAR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.parametrize("skrip", ["app_cuaca.py", "ecmwfensemble.py"])
+def test_disk_cube_hit_still_registers_prefetch(cache_dir, monkeypatch, skrip):
+    # Worker baru menemukan kubus mmap di disk: tidak ada fetch, tapi job prefetch tetap terdaftar
+    terdaftar, dimuat = [], []
+    cube = parse_ensemble(_payload(), ["ecmwf_ifs025_ensemble"])
+
+    def load_cube(versi):
+        dimuat.append(versi)
+        return cube
+
+    def fetch_json(*args, **kwargs):
+        raise AssertionError("kubus dari disk tidak boleh memicu fetch")
+
+    monkeypatch.setattr(prefetch, "ensure", lambda url, params: terdaftar.append((url, params["models"])))
+    monkeypatch.setattr(cache_prakiraan, "data_version", lambda url, params: "v-disk")
+    monkeypatch.setattr(cache_prakiraan, "fetch_json", fetch_json)
+    monkeypatch.setattr(kolom_ensemble, "load_cube", load_cube)
+    monkeypatch.chdir(AKAR)
+    st.cache_resource.clear()
+    st.cache_data.clear()
+
+    at = AppTest.from_file(os.path.join(AKAR, skrip), default_timeout=60).run()
+    assert dimuat == ["v-disk"]
+    assert [u for u, _ in terdaftar] == ["https://ensemble-api.open-meteo.com/v1/ensemble"]
+    assert not [e.value for e in at.error if "gangguan data" in e.value]
@@ -0,0 +1,79 @@
+import pytest
+import requests
+
+import gazetteer
+from gazetteer import lookup_offline, geocode
+
+BALI = {"results": [{"latitude": -8.4095, "longitude": 115.1889, "name": "Bali", "timezone": "Asia/Makassar"}]}
+
+
+class _Session:
+    # Pengganti session API geocoding: payload berurutan, atau galat jaringan bila habis
+    def __init__(self, *payloads):
+        self.payloads = list(payloads)
+        self.names = []
+
+    def get(self, url, params=None, timeout=None):
+        self.names.append(params["name"])
+        if not self.payloads: raise requests.ConnectionError("putus")
+        payload = self.payloads.pop(0)
+        return type("R", (), {"json": lambda s: payload})()
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    monkeypatch.setattr(gazetteer, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(gazetteer, "GEOCODE_DB", str(tmp_path / "geocode.sqlite"))
+    sesi = _Session()
+    monkeypatch.setattr(gazetteer, "get_session", lambda: sesi)
+    return sesi
+
+
+# --- gazetteer offline ---
+def test_exact_name_and_spacing_variants():
+    assert lookup_offline("Wamena")[:3] == (-4.1, 138.95, "Wamena")
+    assert lookup_offline("  palangkaraya ")[2] == "Kota Palangka Raya"
+
+
+def test_kab_and_kota_aliases_pick_the_typed_kind():
+    assert lookup_offline("Jayapura")[2] == "Kota Jayapura"              # kota > kabupaten
+    assert lookup_offline("Kab. Jayapura")[2] == "Kab. Jayapura"
+    assert lookup_offline("kabupaten jayapura")[2] == "Kab. Jayapura"
+    assert lookup_offline("KOTA Jayapura")[2] == "Kota Jayapura"
+
+
+def test_prefix_only_with_flag_and_unique_whole_words():
+    assert lookup_offline("boven") is None
+    assert lookup_offline("boven", prefix=True)[2] == "Kab. Boven Digoel"
+    assert lookup_offline("palangka", prefix=True)[2] == "Kota Palangka Raya"
+    # Sebagian kata tidak cocok; kata utuh yang menunjuk beberapa tempat ambigu
+    assert lookup_offline("wam", prefix=True) is None
+    assert lookup_offline("bali", prefix=True) is None
+    assert lookup_offline("mamberamo", prefix=True) is None
+
+
+# --- urutan geocode ---
+def test_gazetteer_hit_skips_cache_and_api(api):
+    assert geocode("Sentani")[2] == "Sentani"
+    assert api.names == []
+
+
+def test_api_result_is_cached(api):
+    api.payloads.append(BALI)
+    assert geocode("Bali") == (-8.4095, 115.1889, "Bali", "Asia/Makassar")
+    # Kedua kali dari cache: API tidak dipanggil lagi (sesi akan gagal bila dipanggil)
+    assert tuple(geocode("bali")) == (-8.4095, 115.1889, "Bali", "Asia/Makassar")
+    assert api.names == ["Bali"]
+
+
+def test_not_found_is_cached_then_prefix_fallback(api):
+    api.payloads.append({})
+    assert geocode("Boven")[2] == "Kab. Boven Digoel"
+    assert geocode("Boven")[2] == "Kab. Boven Digoel"
+    assert api.names == ["Boven"]                                      # hasil negatif ikut tersimpan
+
+
+def test_api_down_falls_back_to_unique_prefix_only(api):
+    assert geocode("palangka")[2] == "Kota Palangka Raya"
+    assert geocode("Bali") == (None, None, None, None)                 # bukan Balikpapan
+    assert api.names == ["palangka", "Bali"]
@@ -0,0 +1,198 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from inti_cuaca import (ENSEMBLE_VARS, BERAWAN, HUJAN, BADAI, CERAH, build_member_index, parse_ensemble,
+                        build_periods, aggregate_periods, _nan_percentile, wind_stats, analyze_consensus,
+                        horizon_blocks, horizon_summary)
+
+ANGGOTA = {"ecmwf_ifs025_ensemble": 5, "gem_global_ensemble": 3}
+
+
+def _payload(days=2, seed=0):
+    # Respons ensemble kecil dengan pola kolom seperti Open-Meteo
+    rng = np.random.default_rng(seed)
+    n = 24 * days
+    t0 = datetime(2026, 10, 15)
+    hourly = {"time": [(t0 + timedelta(hours=i)).strftime("%Y-%m-%dT%H:%M") for i in range(n)]}
+    for v in ENSEMBLE_VARS:
+        for m, k in ANGGOTA.items():
+            for j in range(k):
+                if v == "temperature_2m": x = 27 + rng.normal(0, 2, n)
+                elif v == "relative_humidity_2m": x = rng.uniform(50, 100, n).round()
+                elif v == "precipitation": x = np.where(rng.random(n) < 0.4, rng.gamma(0.6, 2.5, n), 0).round(1)
+                elif v == "weather_code": x = rng.choice([0, 2, 3, 61, 95], n).astype(float)
+                elif v == "wind_speed_10m": x = rng.uniform(0, 20, n).round(1)
+                else: x = rng.uniform(0, 359, n).round()
+                hourly[f"{v}_{m}" if j == 0 else f"{v}_member{j:02d}_{m}"] = x.tolist()
+    return hourly
+
+
+# --- build_member_index ---
+def test_member_index_matches_whole_names():
+    cols = ["time", "precipitation_gfs", "precipitation_probability_gfs", "precipitation_member02_gfs",
+            "temperature_2m_gfs_seamless", "temperature_2m_member01_gfs_seamless", "temperature_2m_gfs"]
+    index = build_member_index(cols, ["gfs", "gfs_seamless"], ["precipitation", "temperature_2m"])
+    assert index == {
+        ("precipitation", "gfs", 0): 1,
+        ("precipitation", "gfs", 2): 3,
+        ("temperature_2m", "gfs_seamless", 0): 4,
+        ("temperature_2m", "gfs_seamless", 1): 5,
+        ("temperature_2m", "gfs", 0): 6,
+    }
+
+
+def test_member_index_single_model_suffixless():
+    cols = ["time", "temperature_2m", "temperature_2m_member05", "temperature_2m_memberXX"]
+    index = build_member_index(cols, ["icon_global_eps"], ["temperature_2m"])
+    assert index == {("temperature_2m", "icon_global_eps", 0): 1, ("temperature_2m", "icon_global_eps", 5): 2}
+
+
+# --- aggregate_periods vs pandas lama ---
+def _pandas_reference(df, model, t_date, start_h, end_h):
+    # Rumus tabel app_cuaca sebelum inti NumPy, per model & periode
+    df_kat = df[(df["time"].dt.date == t_date) & (df["time"].dt.hour >= start_h) & (df["time"].dt.hour < end_h)]
+
+    def kolom(v):
+        return [f"{v}_{model}"] + [f"{v}_member{j:02d}_{model}" for j in range(1, ANGGOTA[model])]
+
+    m_prec, m_temp = kolom("precipitation"), kolom("temperature_2m")
+    return {
+        "temp_std": df_kat[m_temp].std(axis=1).mean(),
+        "prob": (df_kat[m_prec] > 0.5).sum(axis=1).mean() / len(m_prec) * 100,
+        "max_p": df_kat[m_prec].sum().max(),
+        "temp_min": df_kat[m_temp].min().min(), "temp_max": df_kat[m_temp].max().max(),
+        "rh_min": df_kat[kolom("relative_humidity_2m")].min().min(),
+        "rh_max": df_kat[kolom("relative_humidity_2m")].max().max(),
+        "ws_mean": df_kat[kolom("wind_speed_10m")].mean().mean(),
+    }
+
+
+def test_aggregate_periods_matches_pandas():
+    hourly = _payload()
+    cube = parse_ensemble(hourly, list(ANGGOTA))
+    df = pd.DataFrame(hourly)
+    df["time"] = pd.to_datetime(df["time"])
+    periods = build_periods(datetime(2026, 10, 15, 0, 0), days=2)
+    hasil = aggregate_periods(cube, periods)
+    assert len(hasil) == 8 and all(p is not None for p in hasil)
+
+    for (start_h, end_h, label, t_date), per in zip(periods, hasil):
+        assert (per["label"], per["date"]) == (label, t_date)
+        for mi, m in enumerate(ANGGOTA):
+            acuan = _pandas_reference(df, m, t_date, start_h, end_h)
+            for k, v in acuan.items():
+                # float32 di kubus -> toleransi relatif kecil
+                assert per[k][mi] == pytest.approx(v, rel=1e-5, abs=1e-4), (label, m, k)
+
+
+# --- _nan_percentile ---
+def test_nan_percentile_matches_numpy():
+    rng = np.random.default_rng(1)
+    x = rng.normal(size=(4, 7, 5))
+    x[rng.random(x.shape) < 0.3] = np.nan
+    x[2, :, 3] = np.nan                                  # irisan tanpa data sama sekali
+    q = (10, 50, 90)
+    with pytest.warns(RuntimeWarning):
+        acuan = np.nanpercentile(x, q, axis=1)
+    np.testing.assert_allclose(_nan_percentile(x, q, axis=1), acuan, equal_nan=True)
+
+
+# --- wind_stats ---
+def test_wind_direction_wraps_around_north():
+    arah, kecepatan, sebaran = wind_stats(np.array([5.0, 5.0]), np.array([350.0, 10.0]), axis=0)
+    assert float(arah) == pytest.approx(0.0, abs=1e-6)
+    assert float(kecepatan) == pytest.approx(5 * np.cos(np.deg2rad(10)))
+    assert 0 < float(sebaran) < 15
+
+
+def test_wind_direction_integer_dtype_with_missing():
+    wd = np.array([350, 10, np.iinfo(np.uint16).max], dtype=np.uint16)     # sentinel = hilang
+    arah, _, _ = wind_stats(np.array([5.0, 5.0, 5.0]), wd, axis=0)
+    assert float(arah) == pytest.approx(0.0, abs=1e-6)
+
+
+def test_cancelling_winds_have_no_direction():
+    arah, kecepatan, sebaran = wind_stats(np.array([5.0, 5.0]), np.array([90.0, 270.0]), axis=0)
+    assert np.isnan(arah) and float(kecepatan) == pytest.approx(0.0, abs=1e-9)
+    assert float(sebaran) == 180.0
+
+
+# --- analyze_consensus ---
+def test_consensus_unweighted_counts_models():
+    msg, tingkat = analyze_consensus([HUJAN, BERAWAN, BERAWAN, -1])
+    assert "(67%)" in msg and "Berawan" in msg and tingkat == "info"
+
+
+def test_consensus_weights_shift_majority():
+    msg, tingkat = analyze_consensus([HUJAN, BERAWAN, BERAWAN, -1], weights=[3.0, 1.0, 1.0, 5.0])
+    # Model tidak valid (-1) tidak ikut meski berbobot: Hujan 3 / 5 = 60%
+    assert "(60%)" in msg and "Hujan/Badai" in msg and tingkat == "info"
+
+
+def test_consensus_weights_merge_storm_into_rain():
+    msg, tingkat = analyze_consensus([HUJAN, BADAI, CERAH], weights=[1.0, 1.0, 0.5])
+    assert "(80%)" in msg and "Hujan/Badai" in msg and tingkat == "success"
+
+
+def test_consensus_without_valid_votes():
+    assert analyze_consensus([-1, -1])[1] == "warning"
+    assert analyze_consensus([HUJAN, CERAH], weights=[0.0, 0.0])[1] == "warning"
+
+
+# --- horizon_blocks / horizon_summary ---
+def test_horizon_blocks_skip_partial_and_earlier_hours():
+    t0 = datetime(2026, 10, 15)
+    times = [t0 + timedelta(hours=i) for i in range(24 * 3 - 5)]        # hari ke-3 terpotong
+    blok = horizon_blocks(np.array(times, dtype="datetime64[m]"), t0 + timedelta(days=1))
+    assert [(awal.astype(object), a, b) for awal, a, b in blok] == [(datetime(2026, 10, 16), 24, 48)]
+    assert [b - a for _, a, b in horizon_blocks(times, t0, step_hours=12)] == [12] * 5
+
+
+def _payload_habis(days=4, habis=2):
+    # ECMWF hujan 1 mm/jam sepanjang horizon; GEM kering lalu null sejak hari `habis`
+    # (jangkauan model berakhir, seperti Open-Meteo untuk model berhorizon pendek)
+    n = 24 * days
+    t0 = datetime(2026, 10, 15)
+    hourly = {"time": [(t0 + timedelta(hours=i)).strftime("%Y-%m-%dT%H:%M") for i in range(n)]}
+    nilai = {"temperature_2m": (27.0, 25.0), "relative_humidity_2m": (90.0, 70.0), "precipitation": (1.0, 0.0),
+             "weather_code": (61.0, 3.0), "wind_speed_10m": (5.0, 5.0), "wind_direction_10m": (90.0, 90.0)}
+    for v in ENSEMBLE_VARS:
+        for (m, k), x in zip(ANGGOTA.items(), nilai[v]):
+            for j in range(k):
+                seri = [x] * n if m == "ecmwf_ifs025_ensemble" else [x] * (24 * habis) + [None] * (n - 24 * habis)
+                hourly[f"{v}_{m}" if j == 0 else f"{v}_member{j:02d}_{m}"] = seri
+    return hourly
+
+
+def test_horizon_summary_ignores_models_past_their_range():
+    cube = parse_ensemble(_payload_habis(), list(ANGGOTA))
+    hasil = horizon_summary(cube, datetime(2026, 10, 15).date())
+    assert len(hasil) == 4
+
+    # Hari 1-2: 5 anggota ECMWF basah (24 mm), 3 anggota GEM kering
+    awal = hasil[0]
+    np.testing.assert_allclose(awal["exceed"], [5 / 8 * 100] * 2)
+    assert awal["rain_q"][0] == 0.0 and awal["temp_lo"] < 25.5
+
+    # Hari 3-4: GEM tanpa data tidak dihitung sebagai anggota kering 0 mm
+    for blk in hasil[2:]:
+        np.testing.assert_allclose(blk["exceed"], [100.0, 100.0])
+        np.testing.assert_allclose(blk["rain_q"], [24.0] * 3)
+        assert blk["category"] == HUJAN and blk["share"] == pytest.approx(1.0)
+        assert blk["temp_lo"] == pytest.approx(27.0) and blk["code"] == 61
+
+
+def test_horizon_summary_model_weights_use_members_with_data():
+    cube = parse_ensemble(_payload_habis(), list(ANGGOTA))
+    hasil = horizon_summary(cube, datetime(2026, 10, 15).date(), weights=[1.0, 3.0])
+    np.testing.assert_allclose(hasil[0]["exceed"], [25.0, 25.0])      # bobot GEM 3 dari 4
+    np.testing.assert_allclose(hasil[3]["exceed"], [100.0, 100.0])
+
+
+def test_horizon_summary_skips_blocks_without_any_data():
+    cube = parse_ensemble(_payload_habis(), list(ANGGOTA))
+    cube["data"]["precipitation"][:, :, 24 * 3:] = np.nan
+    assert len(horizon_summary(cube, datetime(2026, 10, 15).date())) == 3
@@ -0,0 +1,98 @@
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import cache_prakiraan
+from prefetch import Prefetcher, RETRY_MINUTES
+
+# Prefetcher terhadap server HTTP lokal pengganti Open-Meteo: jam disuntikkan
+# sehingga pergantian run model bisa disimulasikan tanpa menunggu.
+
+PARAMS = {"latitude": -2.5757, "longitude": 140.5185, "models": ["ecmwf_ifs"],
+          "hourly": ["temperature_2m"], "forecast_days": 3}
+# ecmwf_ifs: run 00/06/12/18 UTC + jeda 7 jam -> tersedia 01, 07, 13, 19 UTC
+MULAI = datetime(2026, 10, 15, 3, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def stub_server():
+    state = {"n": 0, "gagal": False}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            state["n"] += 1
+            # Gangguan: badan bukan JSON (tanpa status 5xx agar retry session tidak menunda test)
+            body = b"<html>gangguan</html>" if state["gagal"] else json.dumps(
+                {"hourly": {"time": ["2026-10-15T00:00"], "temperature_2m_ecmwf_ifs": [27.0]},
+                 "n": state["n"]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    state["url"] = f"http://127.0.0.1:{server.server_address[1]}/v1/forecast"
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+def test_refetch_on_slot_change(cache_dir, stub_server):
+    jam = [MULAI]
+    p = Prefetcher(clock=lambda: jam[0], jitter_s=0)
+    p.register(stub_server["url"], PARAMS)
+
+    wait = p.run_pending()
+    assert stub_server["n"] == 1
+    assert cache_prakiraan.is_fresh(stub_server["url"], PARAMS, jam[0])
+    # Penyegaran berikutnya dijadwalkan saat run 06 UTC tersedia (07 UTC)
+    assert wait == pytest.approx(4 * 3600)
+
+    # Masih di slot yang sama: tidak ada fetch lagi
+    jam[0] = MULAI + timedelta(hours=2)
+    p.run_pending()
+    assert stub_server["n"] == 1
+
+    # Run baru tersedia: diunduh ulang
+    jam[0] = MULAI + timedelta(hours=4, minutes=30)
+    p.run_pending()
+    assert stub_server["n"] == 2
+    res = cache_prakiraan.fetch_json(stub_server["url"], PARAMS, now=jam[0])
+    assert res["n"] == 2
+
+
+def test_serves_stale_on_failure(cache_dir, stub_server):
+    jam = [MULAI]
+    p = Prefetcher(clock=lambda: jam[0], jitter_s=0)
+    p.register(stub_server["url"], PARAMS)
+    p.run_pending()
+
+    stub_server["gagal"] = True
+    jam[0] = MULAI + timedelta(hours=4, minutes=30)
+    p.run_pending()
+    assert stub_server["n"] == 2
+    assert not cache_prakiraan.is_fresh(stub_server["url"], PARAMS, jam[0])
+    # Dashboard (stale_ok) tetap mendapat run terakhir yang tersimpan
+    res = cache_prakiraan.fetch_json(stub_server["url"], PARAMS, now=jam[0], stale_ok=True)
+    assert res["n"] == 1
+
+
+def test_retry_after_fetch_error(cache_dir):
+    jam = [MULAI]
+
+    def fetch(url, params, now=None):
+        raise ConnectionError("putus")
+
+    p = Prefetcher(fetch=fetch, fresh=lambda *a: False, clock=lambda: jam[0], jitter_s=0)
+    p.register("http://stub", PARAMS)
+    wait = p.run_pending()
+    assert wait == pytest.approx(RETRY_MINUTES * 60)
@@ -0,0 +1,36 @@
+import json
+from datetime import datetime
+
+import profil
+
+
+def _rekaman(i, app="app_cuaca"):
+    return {"app": app, "waktu": datetime.now().isoformat(timespec="seconds"),
+            "total_ms": float(i), "tahap": {"periode": float(i) / 2}}
+
+
+def test_read_tail_returns_last_lines_only(tmp_path):
+    path = tmp_path / "log.jsonl"
+    path.write_text("".join(json.dumps(_rekaman(i)) + "\n" for i in range(500)))
+    # Blok kecil: pembacaan mundur berhenti di tengah baris, baris terpotong dilewati
+    ekor = profil._read_tail(str(path), 10, blok=128)
+    assert [r["total_ms"] for r in ekor] == [float(i) for i in range(490, 500)]
+    assert profil._read_tail(str(tmp_path / "kosong.jsonl"), 10) == []
+
+
+def test_recent_is_bounded_and_follows_appends(cache_dir, monkeypatch):
+    path = cache_dir / "metrik.jsonl"
+    path.write_text("".join(json.dumps(_rekaman(i)) + "\n" for i in range(20)))
+    monkeypatch.setattr(profil, "CACHE_DIR", str(cache_dir))
+    monkeypatch.setattr(profil, "METRIK_PATH", str(path))
+    monkeypatch.setattr(profil, "EKOR_MAKS", 8)
+    monkeypatch.setattr(profil, "_ekor", None)
+
+    assert [r["total_ms"] for r in profil._recent()] == [float(i) for i in range(12, 20)]
+    profil._append(_rekaman(99, app="mainkode"))
+    # Tanpa membaca log lagi: ekor di memori ikut bertambah, panjang tetap dibatasi
+    path.write_text("")
+    terbaru = profil._recent()
+    assert len(terbaru) == 8 and terbaru[-1]["app"] == "mainkode"
+    ringkas = profil._summarize(terbaru, "app_cuaca")["app_cuaca"]
+    assert ringkas["TOTAL"]["n"] == 7 and ringkas["periode"]["p50"] == 8.0
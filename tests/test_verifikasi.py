@@ -0,0 +1,127 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+import arsip
+import verifikasi
+from verifikasi import verify_block, scores, update_weights, model_weights, MIN_HARI, MIN_SAMPEL
+
+LOKASI = arsip.resolve_location("Sentani")
+WIT = 9 * 3600
+
+
+def _jam_utc(teks):
+    return int(np.datetime64(teks, "h").astype(np.int64))
+
+
+# --- verify_block ---
+def test_verify_block_pairs_local_hours_with_utc_obs():
+    seg = (LOKASI, "2026-10-15", "ecmwf_ifs", "2026-10-14T12", "deterministik", WIT)
+    jam = np.arange(24)
+    hujan_f = np.zeros((2, 24), dtype=np.float32)
+    hujan_f[0, 12:18] = 1.0                                    # anggota 0: 6 mm siang, anggota 1 kering
+    blok = {"jam": jam.astype(np.int8),
+            "temperature_2m": np.array([[28.0] * 24, [30.0] * 24], dtype=np.float32),
+            "precipitation": hujan_f}
+    # 00 WIT = 15 UTC hari sebelumnya; jam terakhir MALAM tidak teramati
+    o_jam = _jam_utc("2026-10-14T15") + np.arange(23)
+    o_hujan = np.where((jam[:23] >= 12) & (jam[:23] < 18), 0.5, 0.0)
+    baris = {r[4]: r for r in verify_block(seg, blok, (o_jam, np.full(23, 28.0), o_hujan))}
+
+    assert list(baris) == ["DINI HARI", "PAGI", "SIANG", "MALAM"]
+    dini = baris["DINI HARI"]
+    assert dini[:4] == (LOKASI, "ecmwf_ifs", "2026-10-14T12", "2026-10-15")
+    assert dini[5:] == ("deterministik", 3, 6, 6.0, 6.0, 0.0, 0.0, 0.0)      # lead dari init model
+    assert baris["SIANG"][6] == 15 and baris["SIANG"][10:] == (3.0, 3.0, 0.5)
+    # Periode tanpa observasi lengkap: suhu 5 jam, hujan tidak dinilai
+    assert baris["MALAM"][7] == 5 and baris["MALAM"][10:] == (None, None, None)
+
+
+# --- scores ---
+def _isi(rows):
+    con = verifikasi._connect()
+    with con:
+        con.executemany("INSERT INTO statistik VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    con.close()
+
+
+def test_scores_from_sufficient_statistics(arsip_dir):
+    _isi([
+        (LOKASI, "a", "2026-10-14T12", "2026-10-15", "SIANG", "ensemble", 15, 6, 6.0, 6.0, 2.0, 2.0, 1.0),
+        (LOKASI, "a", "2026-10-15T12", "2026-10-16", "SIANG", "ensemble", 15, 6, -6.0, 6.0, 1.0, 0.0, 0.8),
+        (LOKASI, "b", "2026-10-14T12", "2026-10-15", "SIANG", "ensemble", 15, 6, 3.0, 3.0, 0.0, 5.0, 0.0),
+        (LOKASI, "b", "2026-10-16T12", "2026-10-15", "SIANG", "ensemble", -9, 6, 60.0, 60.0, 9.0, 0.0, 1.0),
+    ])
+    df = scores("Sentani", per=("model",)).set_index("model")
+    a, b = df.loc["a"], df.loc["b"]
+    assert (a.n_suhu, a.mae_suhu, a.bias_suhu) == (12, 1.0, 0.0)
+    assert (a.mae_hujan, a.bias_hujan) == (0.5, 0.5)
+    assert a.brier == pytest.approx(0.32)
+    assert (a.pod, a.far) == (1.0, 0.5)
+    # Lead negatif (run setelah periode berlaku) tidak ikut dinilai
+    assert (b.n_suhu, b.pod) == (6, 0.0) and np.isnan(b.far)
+
+
+# --- update_weights / model_weights ---
+def _hari(n, model, benar, jenis="deterministik", awal=date(2026, 10, 1), p=None):
+    # n hari SIANG: prakiraan hujan tepat (benar) atau selalu salah; `p` = peluang tetap
+    rows = []
+    for i in range(n):
+        tanggal = str(awal + timedelta(days=i))
+        o = 5.0 if i % 2 else 0.0
+        pp = p if p is not None else (float(o > 0) if benar else float(o == 0))
+        rows.append((LOKASI, model, f"{tanggal}T00", tanggal, "SIANG", jenis, 12, 6, 0.0, 0.0, None, o, pp))
+    return rows
+
+
+def _bobot():
+    con = verifikasi._connect()
+    try:
+        return dict(con.execute("SELECT model, bobot FROM bobot"))
+    finally:
+        con.close()
+
+
+def test_few_observed_days_keep_weight_one(arsip_dir):
+    _isi(_hari(MIN_HARI - 1, "meteofrance_seamless", True) + _hari(MIN_HARI - 1, "gfs_seamless", False))
+    assert update_weights() == 2
+    assert _bobot() == {"meteofrance_seamless": 1.0, "gfs_seamless": 1.0}
+
+
+def test_weights_shrink_on_log_scale_and_cap(arsip_dir):
+    n = 60
+    _isi(_hari(n, "meteofrance_seamless", True) + _hari(n, "gfs_seamless", False))
+    update_weights()
+    w = _bobot()
+    # Brier 0 vs 1: rasio dibatasi 4 sebelum disusutkan, jadi model "sempurna" tidak mencapai batas
+    faktor = n / (n + MIN_SAMPEL)
+    assert w["meteofrance_seamless"] == pytest.approx(4.0 ** faktor)
+    assert w["gfs_seamless"] == pytest.approx((0.51 / 1.0) ** faktor)
+    assert 1.0 < w["meteofrance_seamless"] < 4.0
+
+
+def test_reference_is_computed_per_model_kind(arsip_dir):
+    deterministik = _hari(30, "meteofrance_seamless", True, p=0.9) + _hari(30, "gfs_seamless", True, p=0.3)
+    _isi(deterministik)
+    update_weights()
+    sebelum = _bobot()
+    # Ensemble berskill jauh berbeda tidak menggeser bobot model deterministik
+    _isi(_hari(30, "ecmwf_ifs025_ensemble", True, jenis="ensemble", p=0.5))
+    update_weights()
+    sesudah = _bobot()
+    assert sesudah["meteofrance_seamless"] == pytest.approx(sebelum["meteofrance_seamless"])
+    assert sesudah["gfs_seamless"] == pytest.approx(sebelum["gfs_seamless"])
+    assert sesudah["ecmwf_ifs025_ensemble"] == 1.0           # satu-satunya ensemble -> acuan dirinya
+
+
+def test_model_weights_lookup(arsip_dir):
+    assert model_weights("Sentani", date(2026, 10, 20), "SIANG", ["gfs_seamless"]) is None
+    _isi(_hari(60, "meteofrance_seamless", True) + _hari(60, "gfs_seamless", False))
+    update_weights()
+    w = _bobot()
+    hasil = model_weights("Sentani", date(2026, 10, 20), "SIANG", ["gfs_seamless", "meteofrance_seamless", "icon_seamless"])
+    np.testing.assert_allclose(hasil, [w["gfs_seamless"], w["meteofrance_seamless"], 1.0])
+    # Musim / periode tanpa verifikasi: konsensus bobot sama
+    assert model_weights("Sentani", date(2026, 1, 20), "SIANG", ["gfs_seamless"]) is None
+    assert model_weights("Sentani", date(2026, 10, 20), "PAGI", ["gfs_seamless"]) is None
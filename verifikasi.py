@@ -0,0 +1,456 @@
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+import arsip
+from inti_cuaca import as_float, URUTAN_WAKTU
+
+# Verifikasi prakiraan arsip (arsip.py) terhadap observasi stasiun (CSV per jam
+# atau berita SYNOP FM-12). Setiap blok arsip (lokasi, tanggal, model, init)
+# dipasangkan dengan observasi lewat join searchsorted pada jam UTC, lalu
+# diringkas per periode DINI HARI/PAGI/SIANG/MALAM menjadi statistik cukup
+# (jumlah galat suhu, peluang & curah hujan) di tabel SQLite. Run malam hanya
+# memproses blok baru; skor (MAE, bias, Brier, POD/FAR) dihitung dengan GROUP BY
+# per model / periode / lead time dari tabel tersebut. Bobot skill per lokasi, musim
+# & periode untuk konsensus dashboard diturunkan sekali setelah tiap verifikasi.
+#
+#   python verifikasi.py --obs obs_sentani.csv                  # tambah blok baru lalu tampilkan skor
+#   python verifikasi.py --synop synop_202610.txt --wmo 97690=Sentani
+#   python verifikasi.py --skor --lokasi Sentani --per model,periode
+#   python verifikasi.py --bobot                                # bobot skill konsensus dashboard
+
+VERIF_PATH = os.path.join(arsip.ARSIP_DIR, "verifikasi.sqlite")
+AMBANG_HUJAN = 1.0          # mm per periode 6 jam: kejadian hujan
+AMBANG_YA = 0.5             # peluang >= ini dihitung prakiraan "hujan" (hit / false alarm)
+VAR_VERIF = ("temperature_2m", "precipitation")
+
+KOLOM_WAKTU = ("waktu", "time", "timestamp", "tanggal_jam")
+KOLOM_SUHU = ("suhu", "temperature_2m", "temp", "tt")
+KOLOM_HUJAN = ("hujan", "curah", "precipitation", "rr")
+KOLOM_LOKASI = ("stasiun", "nama", "lokasi")
+
+
+# --- 1. OBSERVASI ---
+def _pick(columns, names):
+    lower = {c.lower(): c for c in columns}
+    return next((lower[n] for n in names if n in lower), None)
+
+
+def load_csv_obs(path, lokasi=None):
+    # CSV per jam: kolom waktu (UTC bila tanpa zona), suhu (°C), hujan (mm dalam jam
+    # tersebut), serta stasiun (nama di stasiun.csv) atau lat/lon; `lokasi` dipakai
+    # bila file hanya berisi satu stasiun -> DataFrame (lokasi, jam_utc, suhu, hujan)
+    import pandas as pd
+    df = pd.read_csv(path)
+    waktu = _pick(df.columns, KOLOM_WAKTU)
+    if waktu is None: raise ValueError(f"{path}: kolom waktu tidak ditemukan")
+    jam = pd.to_datetime(df[waktu], utc=True).dt.floor("h").dt.tz_localize(None)
+
+    kolom_lok = _pick(df.columns, KOLOM_LOKASI)
+    if kolom_lok is not None:
+        kunci = df[kolom_lok].map(lambda n: arsip.resolve_location(str(n)))
+    elif {"lat", "lon"} <= set(df.columns):
+        kunci = [arsip.location_key(a, b) for a, b in zip(df["lat"], df["lon"])]
+    elif lokasi is not None:
+        kunci = arsip.resolve_location(lokasi)
+    else:
+        raise ValueError(f"{path}: tentukan kolom stasiun/lat-lon atau --lokasi")
+
+    suhu, hujan = _pick(df.columns, KOLOM_SUHU), _pick(df.columns, KOLOM_HUJAN)
+    return pd.DataFrame({
+        "lokasi": kunci,
+        "jam_utc": jam.to_numpy().astype("datetime64[h]").astype(np.int64),
+        "suhu": pd.to_numeric(df[suhu], errors="coerce") if suhu else np.nan,
+        "hujan": pd.to_numeric(df[hujan], errors="coerce") if hujan else np.nan,
+    })
+
+
+# Durasi tR pada grup 6RRRtR (jam); 0 / tidak dikenal -> dilewati
+DURASI_TR = {1: 6, 2: 12, 3: 18, 4: 24, 5: 1, 6: 2, 7: 3, 8: 9, 9: 15}
+
+
+def _rrr(kode):
+    if kode == 990: return 0.0          # jejak
+    if kode >= 991: return (kode - 990) / 10
+    return float(kode)
+
+
+def parse_synop(text, tahun_bulan=None):
+    # Berita SYNOP FM-12 (AAXX) -> [(wmo, waktu UTC, suhu, [(curah mm, durasi jam)])].
+    # Tahun & bulan tidak ada di SYNOP: diambil dari awalan YYYYMMDDHHMM pada baris
+    # bila ada, selain itu dari `tahun_bulan` (datetime/str "YYYY-MM").
+    if isinstance(tahun_bulan, str): tahun_bulan = datetime.strptime(tahun_bulan, "%Y-%m")
+    hasil = []
+    for berita in re.split(r"=", text):
+        grup = berita.split()
+        awalan = next((g for g in grup[:2] if re.fullmatch(r"\d{12}", g)), None)
+        if "AAXX" not in grup: continue
+        grup = grup[grup.index("AAXX") + 1:]
+        if len(grup) < 4 or not re.fullmatch(r"\d{5}", grup[0]): continue
+        yy, gg = int(grup[0][:2]), int(grup[0][2:4])
+        acuan = datetime.strptime(awalan[:6], "%Y%m") if awalan else tahun_bulan
+        if acuan is None: continue
+        try:
+            waktu = acuan.replace(day=yy, hour=gg, minute=0)
+        except ValueError:
+            continue
+        wmo, ir = grup[1], grup[2][0]
+        suhu, hujan = np.nan, []
+        bagian = 1
+        for g in grup[4:]:
+            if g == "333":
+                bagian = 3
+                continue
+            if re.fullmatch(r"\d{3}", g) and bagian == 3: break          # bagian 5 (555) dsb.
+            if not re.fullmatch(r"\d{5}", g): continue
+            if bagian == 1 and g[0] == "1" and g[1] in "01" and g[2:] != "///":
+                suhu = int(g[2:]) / 10 * (-1 if g[1] == "1" else 1)
+            elif g[0] == "6" and g[1:4].isdigit() and int(g[4]) in DURASI_TR:
+                hujan.append((_rrr(int(g[1:4])), DURASI_TR[int(g[4])]))
+        if ir == "3" and not hujan: hujan.append((0.0, 6))             # dilaporkan tidak ada hujan
+        hasil.append((wmo, waktu, suhu, hujan))
+    return hasil
+
+
+def load_synop(path, wmo_map, tahun_bulan=None):
+    # SYNOP -> DataFrame per jam seperti load_csv_obs. Curah dengan durasi tR dibagi
+    # rata ke jam-jam di dalam jendelanya (pendekatan: total per periode tetap, pola
+    # di dalam jendela tidak diketahui); jendela terpendek menang bila bertumpuk.
+    import pandas as pd
+    with open(path, encoding="utf-8", errors="replace") as f:
+        berita = parse_synop(f.read(), tahun_bulan)
+    suhu, hujan = {}, {}
+    for wmo, waktu, t, rr in berita:
+        if wmo not in wmo_map: continue
+        kunci = arsip.resolve_location(wmo_map[wmo])
+        jam = int(np.datetime64(waktu, "h").astype(np.int64))
+        if not np.isnan(t): suhu[kunci, jam] = t
+        for curah, durasi in sorted(rr, key=lambda x: -x[1]):
+            for j in range(jam - durasi, jam):
+                hujan[kunci, j + 1] = curah / durasi
+    keys = sorted(set(suhu) | set(hujan))
+    return pd.DataFrame({"lokasi": [k for k, _ in keys], "jam_utc": [j for _, j in keys],
+                         "suhu": [suhu.get(k, np.nan) for k in keys], "hujan": [hujan.get(k, np.nan) for k in keys]})
+
+
+def _obs_arrays(obs):
+    # DataFrame observasi -> {lokasi: (jam_utc terurut, suhu, hujan)}; jam ganda dirata-rata
+    hasil = {}
+    for lok, g in obs.groupby("lokasi"):
+        g = g.groupby("jam_utc", sort=True)[["suhu", "hujan"]].mean()
+        hasil[lok] = (g.index.to_numpy(np.int64), g["suhu"].to_numpy(np.float64), g["hujan"].to_numpy(np.float64))
+    return hasil
+
+
+# --- 2. PASANGAN PRAKIRAAN-OBSERVASI ---
+def _connect():
+    os.makedirs(arsip.ARSIP_DIR, exist_ok=True)
+    con = sqlite3.connect(VERIF_PATH, timeout=30)
+    con.execute("PRAGMA journal_mode=WAL")
+    if "run" in [r[1] for r in con.execute("PRAGMA table_info(statistik)")]:
+        # Skema lama dikunci slot run gabungan (run model ganda terhitung berulang);
+        # statistik turunan dibuang dan dibangun ulang dari arsip pada verifikasi berikutnya
+        with con:
+            for tabel in ("statistik", "blok_selesai", "bobot"): con.execute(f"DROP TABLE IF EXISTS {tabel}")
+    con.execute("""CREATE TABLE IF NOT EXISTS statistik (
+        lokasi TEXT NOT NULL, model TEXT NOT NULL, init TEXT NOT NULL, tanggal TEXT NOT NULL,
+        periode TEXT NOT NULL, jenis TEXT NOT NULL, lead_jam INTEGER NOT NULL,
+        n_suhu INTEGER NOT NULL, galat_suhu REAL NOT NULL, abs_suhu REAL NOT NULL,
+        f_hujan REAL, o_hujan REAL, p_hujan REAL,
+        PRIMARY KEY (lokasi, model, init, tanggal, periode)) WITHOUT ROWID""")
+    con.execute("CREATE INDEX IF NOT EXISTS statistik_tanggal ON statistik (lokasi, tanggal)")
+    con.execute("""CREATE TABLE IF NOT EXISTS blok_selesai (
+        lokasi TEXT NOT NULL, tanggal TEXT NOT NULL, model TEXT NOT NULL, init TEXT NOT NULL,
+        PRIMARY KEY (lokasi, tanggal, model, init)) WITHOUT ROWID""")
+    con.execute("""CREATE TABLE IF NOT EXISTS bobot (
+        lokasi TEXT NOT NULL, musim TEXT NOT NULL, periode TEXT NOT NULL, model TEXT NOT NULL,
+        n INTEGER NOT NULL, brier REAL, bobot REAL NOT NULL,
+        PRIMARY KEY (lokasi, musim, periode, model)) WITHOUT ROWID""")
+    return con
+
+
+def _init_hour(init):
+    # Jam inisialisasi run model (arsip.model_init, "YYYY-MM-DDTHH" UTC) -> jam sejak epoch
+    return int(np.datetime64(init, "h").astype(np.int64))
+
+
+def _day_end_utc(tanggal, utc_offset):
+    # Jam UTC (sejak epoch) akhir hari lokal `tanggal`
+    return int(np.datetime64(tanggal, "h").astype(np.int64)) + 24 - utc_offset // 3600
+
+
+def verify_block(seg, blok, obs_lok):
+    # Satu blok arsip (anggota, jam lokal) vs observasi lokasinya -> baris statistik per periode
+    lokasi, tanggal, model, init, jenis, utc_offset = seg
+    jam = blok["jam"].astype(np.int64)
+    jam_utc = np.datetime64(tanggal, "h").astype(np.int64) + jam - utc_offset // 3600
+    o_jam, o_suhu, o_hujan = obs_lok
+    pos = np.minimum(np.searchsorted(o_jam, jam_utc), len(o_jam) - 1)
+    cocok = o_jam[pos] == jam_utc
+    suhu_o = np.where(cocok, o_suhu[pos], np.nan)
+    hujan_o = np.where(cocok, o_hujan[pos], np.nan)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        suhu_f = np.nanmean(as_float(blok["temperature_2m"]), axis=0)
+        prec = as_float(blok["precipitation"])
+    galat = suhu_f - suhu_o
+    jam_init = _init_hour(init)
+
+    baris = []
+    periode = jam // 6
+    for k in np.unique(periode):
+        sel = periode == k
+        ok = ~np.isnan(galat[sel])
+        f = o = p = None
+        # Hujan hanya untuk periode lengkap: 6 jam prakiraan dan 6 jam observasi
+        if sel.sum() == 6 and not np.isnan(hujan_o[sel]).any():
+            total = prec[:, sel]
+            valid = ~np.isnan(total).all(axis=1)
+            if valid.any():
+                total = np.nansum(total[valid], axis=1)
+                f, o, p = float(total.mean()), float(hujan_o[sel].sum()), float((total >= AMBANG_HUJAN).mean())
+        if not ok.any() and p is None: continue
+        e = galat[sel][ok]
+        baris.append((lokasi, model, init, tanggal, URUTAN_WAKTU[int(k)][2], jenis, int(jam_utc[sel][0] - jam_init),
+                      int(ok.sum()), float(e.sum()), float(np.abs(e).sum()), f, o, p))
+    return baris
+
+
+def _verify_job(args):
+    segs, obs_lok = args
+    baris = []
+    for seg, (path, offset, panjang) in segs:
+        baris.extend(verify_block(seg, arsip.read_block(path, offset, panjang, VAR_VERIF), obs_lok))
+    return baris
+
+
+def _store_results(con, jobs, hasil):
+    n_blok = 0
+    with con:
+        for (segs, _), baris in zip(jobs, hasil):
+            con.executemany("INSERT OR REPLACE INTO statistik VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", baris)
+            con.executemany("INSERT OR IGNORE INTO blok_selesai VALUES (?, ?, ?, ?)", [s[:4] for s, _ in segs])
+            n_blok += len(segs)
+    return n_blok
+
+
+def run_verification(obs, ulang=False, workers=1):
+    # Tambahkan statistik untuk blok arsip yang tanggalnya sudah tercakup observasi
+    # dan belum pernah diverifikasi. Mengembalikan jumlah blok yang diproses.
+    obs_arr = _obs_arrays(obs)
+    if not obs_arr: return 0
+    con = _connect()
+    try:
+        if ulang:
+            with con:
+                con.execute("DELETE FROM statistik")
+                con.execute("DELETE FROM blok_selesai")
+        selesai = set(con.execute("SELECT lokasi, tanggal, model, init FROM blok_selesai"))
+        jobs = []
+        for lok, (o_jam, _, _) in obs_arr.items():
+            # Rentang tanggal lokal yang mungkin tercakup observasi (zona +-14 jam)
+            awal = str(np.datetime64(int(o_jam[0]) - 14, "h").astype("datetime64[D]"))
+            akhir = str(np.datetime64(int(o_jam[-1]) + 14, "h").astype("datetime64[D]"))
+            # Blok yang hari lokalnya belum selesai teramati ditunda ke run berikutnya,
+            # supaya tidak ditandai selesai dengan observasi parsial. Satu sampel per
+            # (lokasi, tanggal, model, init): run model yang sama tidak terhitung dua kali.
+            unik = {r[:4]: r for r in arsip.segments(lok, awal, akhir)}
+            segs = [(r[:6], r[6:]) for k, r in unik.items()
+                    if k not in selesai and _day_end_utc(r[1], r[5]) <= o_jam[-1] + 1]
+            if not segs: continue
+            # Pecah per lokasi menjadi beberapa pekerjaan agar bisa diproses paralel
+            n = max(1, len(segs) // max(workers * 4, 1))
+            jobs.extend((segs[i:i + n], obs_arr[lok]) for i in range(0, len(segs), n))
+
+        if workers <= 1:
+            n_blok = _store_results(con, jobs, map(_verify_job, jobs))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                n_blok = _store_results(con, jobs, pool.map(_verify_job, jobs))
+        if n_blok: update_weights(con)
+        return n_blok
+    finally:
+        con.close()
+
+
+# --- 3. SKOR ---
+KELOMPOK = {"model": "model", "periode": "periode", "lead": "lead_jam / 24", "lokasi": "lokasi",
+            "jenis": "jenis", "bulan": "substr(tanggal, 6, 2)"}
+
+
+def scores(lokasi=None, per=("model", "periode", "lead"), sejak=None, bulan=None, periode=None):
+    # Skor dari statistik cukup, dikelompokkan menurut `per` (lihat KELOMPOK; "lead" =
+    # lead time dalam hari). MAE/bias suhu (°C), MAE/bias & Brier hujan per periode,
+    # POD (hit rate) & FAR (false alarm ratio) untuk kejadian >= AMBANG_HUJAN.
+    import pandas as pd
+    if not os.path.exists(VERIF_PATH): return pd.DataFrame()
+    kolom = [f"{KELOMPOK[k]} AS {k}" for k in per]
+    where, args = ["lead_jam >= 0"], []
+    if lokasi: where, args = where + ["lokasi = ?"], args + [arsip.resolve_location(lokasi)]
+    if sejak: where, args = where + ["tanggal >= ?"], args + [str(sejak)]
+    if periode: where, args = where + ["periode = ?"], args + [periode]
+    if bulan:
+        where.append(f"substr(tanggal, 6, 2) IN ({','.join('?' * len(bulan))})")
+        args += [f"{int(b):02d}" for b in bulan]
+    kejadian = f"(o_hujan >= {AMBANG_HUJAN})"
+    ya = f"(p_hujan >= {AMBANG_YA})"
+    sql = f"""SELECT {', '.join(kolom + [''])}
+        SUM(n_suhu) AS n_suhu,
+        SUM(abs_suhu) / NULLIF(SUM(n_suhu), 0) AS mae_suhu,
+        SUM(galat_suhu) / NULLIF(SUM(n_suhu), 0) AS bias_suhu,
+        COUNT(p_hujan) AS n_hujan,
+        AVG(ABS(f_hujan - o_hujan)) AS mae_hujan,
+        AVG(f_hujan - o_hujan) AS bias_hujan,
+        AVG((p_hujan - {kejadian}) * (p_hujan - {kejadian})) AS brier,
+        1.0 * SUM({ya} AND {kejadian}) / NULLIF(SUM({kejadian}), 0) AS pod,
+        1.0 * SUM({ya} AND NOT {kejadian}) / NULLIF(SUM({ya} AND p_hujan IS NOT NULL), 0) AS far
+        FROM statistik WHERE {' AND '.join(where)}"""
+    if per: sql += f" GROUP BY {', '.join(per)} ORDER BY {', '.join(per)}"
+    con = _connect()
+    try:
+        return pd.read_sql_query(sql, con, params=args)
+    finally:
+        con.close()
+
+
+# --- 4. BOBOT SKILL ---
+# Musim Indonesia: DJF puncak hujan (monsun barat), JJA kemarau, MAM/SON peralihan
+MUSIM = {12: "DJF", 1: "DJF", 2: "DJF", 3: "MAM", 4: "MAM", 5: "MAM",
+         6: "JJA", 7: "JJA", 8: "JJA", 9: "SON", 10: "SON", 11: "SON"}
+HARI_SKILL = 365            # skill "terkini": setahun terakhir, jadi satu musim terakhir per musim
+LEAD_MAKS_JAM = 72          # horizon tabel konsensus dashboard (2 hari + sisa hari ini)
+MIN_HARI = 14               # hari teramati minimum sebelum bobot boleh menjauh dari 1
+MIN_SAMPEL = 30             # penyusutan log-bobot: faktor n / (n + MIN_SAMPEL)
+BOBOT_BATAS = (0.25, 4.0)   # batas rasio skill sebelum disusutkan
+BRIER_MIN = 0.02            # cegah bobot tak hingga untuk model yang kebetulan sempurna
+
+
+def update_weights(con=None):
+    # Hitung ulang tabel bobot dari statistik: per (lokasi, musim, periode) rasio skill
+    # model = rata-rata Brier model sejenis / Brier model, dibatasi BOBOT_BATAS, lalu
+    # disusutkan ke 1 pada skala log (bobot = rasio ** (n / (n + MIN_SAMPEL))). Acuan
+    # dihitung per jenis: Brier deterministik (0/1 per hari) tidak sebanding dengan
+    # Brier peluang ensemble. n = hari teramati berbeda, bukan jumlah run: run-run yang
+    # memverifikasi periode yang sama saling berkorelasi; di bawah MIN_HARI bobot tetap 1.
+    # Dipanggil setelah verifikasi.
+    tutup = con is None
+    con = con or _connect()
+    try:
+        akhir = con.execute("SELECT MAX(tanggal) FROM statistik").fetchone()[0]
+        if akhir is None: return 0
+        sejak = str(np.datetime64(akhir) - np.timedelta64(HARI_SKILL, "D"))
+        musim = "CASE " + " ".join(f"WHEN substr(tanggal, 6, 2) = '{b:02d}' THEN '{m}'" for b, m in MUSIM.items()) + " END"
+        kejadian = f"(o_hujan >= {AMBANG_HUJAN})"
+        rows = con.execute(f"""SELECT lokasi, {musim} AS musim, periode, jenis, model,
+            COUNT(DISTINCT CASE WHEN p_hujan IS NOT NULL THEN tanggal END),
+            AVG((p_hujan - {kejadian}) * (p_hujan - {kejadian}))
+            FROM statistik WHERE tanggal > ? AND lead_jam >= 0 AND lead_jam < ?
+            GROUP BY lokasi, musim, periode, jenis, model""", (sejak, LEAD_MAKS_JAM)).fetchall()
+
+        kelompok = {}
+        for lok, mus, per, jenis, m, n, bs in rows:
+            kelompok.setdefault((lok, mus, per, jenis), []).append((m, n, bs))
+        baris = []
+        for (lok, mus, per, _), isi in kelompok.items():
+            acuan = [max(bs, BRIER_MIN) for _, n, bs in isi if n >= MIN_HARI and bs is not None]
+            acuan = float(np.mean(acuan)) if acuan else None
+            for m, n, bs in isi:
+                w = 1.0
+                if acuan and n >= MIN_HARI and bs is not None:
+                    rel = np.clip(acuan / max(bs, BRIER_MIN), *BOBOT_BATAS)
+                    w = float(np.exp(np.log(rel) * n / (n + MIN_SAMPEL)))
+                baris.append((lok, mus, per, m, n, bs, w))
+        with con:
+            con.execute("DELETE FROM bobot")
+            con.executemany("INSERT INTO bobot VALUES (?, ?, ?, ?, ?, ?, ?)", baris)
+        return len(baris)
+    finally:
+        if tutup: con.close()
+
+
+_BOBOT = {"versi": None, "tabel": {}}
+
+
+def skill_table():
+    # {(lokasi, musim, periode): {model: bobot}} dari tabel bobot; dibaca ulang hanya bila
+    # file verifikasi berubah, jadi pemanggilan per rerun dashboard cukup satu os.stat
+    try:
+        versi = max(os.path.getmtime(p) for p in (VERIF_PATH, VERIF_PATH + "-wal") if os.path.exists(p))
+    except ValueError:
+        return {}
+    if _BOBOT["versi"] != versi:
+        tabel = {}
+        con = _connect()
+        try:
+            for lok, mus, per, m, w in con.execute("SELECT lokasi, musim, periode, model, bobot FROM bobot"):
+                tabel.setdefault((lok, mus, per), {})[m] = w
+        finally:
+            con.close()
+        _BOBOT.update(versi=versi, tabel=tabel)
+    return _BOBOT["tabel"]
+
+
+def model_weights(lokasi, tanggal, periode, models):
+    # Bobot skill per model (urutan `models`) untuk lokasi, musim tanggal & periode;
+    # None bila belum ada verifikasi -> konsensus bobot sama seperti biasa
+    tabel = skill_table().get((arsip.resolve_location(lokasi), MUSIM[tanggal.month], periode))
+    if not tabel: return None
+    return np.array([tabel.get(m, 1.0) for m in models])
+
+
+# --- 5. CLI ---
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Verifikasi prakiraan arsip terhadap observasi stasiun")
+    ap.add_argument("--obs", nargs="*", default=[], help="CSV observasi per jam")
+    ap.add_argument("--synop", nargs="*", default=[], help="file berita SYNOP (AAXX)")
+    ap.add_argument("--wmo", nargs="*", default=[], help="pemetaan nomor WMO ke stasiun, mis. 97690=Sentani")
+    ap.add_argument("--bulan-synop", help="YYYY-MM untuk SYNOP tanpa awalan tanggal")
+    ap.add_argument("--lokasi", help="stasiun untuk CSV tanpa kolom stasiun, dan filter skor")
+    ap.add_argument("--ulang", action="store_true", help="hapus statistik lalu verifikasi ulang seluruh arsip")
+    ap.add_argument("--proses", type=int, default=1, help="jumlah proses pembaca blok arsip")
+    ap.add_argument("--skor", action="store_true", help="hanya tampilkan skor")
+    ap.add_argument("--per", default="model,periode,lead", help=f"kelompok skor: {','.join(KELOMPOK)}")
+    ap.add_argument("--sejak", help="tanggal awal skor (YYYY-MM-DD)")
+    ap.add_argument("--bobot", action="store_true", help="tampilkan bobot skill konsensus")
+    args = ap.parse_args(argv)
+
+    if args.bobot:
+        import pandas as pd
+        if not os.path.exists(VERIF_PATH): return 0
+        con = _connect()
+        try:
+            df = pd.read_sql_query("SELECT * FROM bobot ORDER BY lokasi, musim, periode, model", con)
+        finally:
+            con.close()
+        print(df.to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+        return 0
+
+    if not args.skor:
+        import pandas as pd
+        bagian = [load_csv_obs(p, args.lokasi) for p in args.obs]
+        wmo_map = dict(w.split("=", 1) for w in args.wmo)
+        bagian += [load_synop(p, wmo_map, args.bulan_synop) for p in args.synop]
+        if not bagian: ap.error("berikan --obs dan/atau --synop, atau --skor")
+        t0 = time.perf_counter()
+        n = run_verification(pd.concat(bagian, ignore_index=True), args.ulang, args.proses)
+        print(f"{n} blok arsip diverifikasi dalam {time.perf_counter() - t0:.1f} detik")
+
+    df = scores(args.lokasi, [k.strip() for k in args.per.split(",") if k.strip()], args.sejak)
+    if df.empty:
+        print("Belum ada statistik verifikasi.")
+        return 0
+    print(df.to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())